@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import itertools
+import logging
+import random
+from typing import Any, Optional, Tuple
+
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout, TransportError
+
+from metrics import InstrumentedAsyncElasticsearch
+
+logger = logging.getLogger("signal2bug.es_client")
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before retrying a failed Elasticsearch call."""
+
+    max_retries: int = 0
+    retry_on_status: Tuple[int, ...] = (429, 502, 503, 504)
+    retry_on_timeout: bool = False
+    backoff_factor: float = 1.0
+    backoff_max: float = 30.0
+
+    def retryable(self, exc: Exception) -> bool:
+        if isinstance(exc, ApiError):
+            return exc.status_code in self.retry_on_status
+        if isinstance(exc, ConnectionTimeout):
+            return self.retry_on_timeout
+        return isinstance(exc, ConnectionError)
+
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter: half the step is fixed, the other half random."""
+        step = min(self.backoff_max, self.backoff_factor * 2**attempt)
+        return step / 2 + random.uniform(0, step / 2)
+
+
+class RetryingAsyncElasticsearch(InstrumentedAsyncElasticsearch):
+    """
+    InstrumentedAsyncElasticsearch that retries failed calls itself, sleeping between attempts.
+
+    The transport retries connection errors back-to-back, and retries 429/5xx responses
+    back-to-back too: its only backoff is the dead-node timeout, which it skips when the
+    pool has a single node. Create this client with max_retries=0 so the transport never
+    retries, and pass the policy as `retry`. Every attempt is timed as its own call.
+
+    `.options(max_retries=n)` overrides the policy's retry count for the derived client.
+    """
+
+    def __init__(self, *args: Any, retry: RetryPolicy = RetryPolicy(), **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.retry = retry
+
+    def options(self, *, max_retries: Optional[int] = None, **kwargs: Any) -> "RetryingAsyncElasticsearch":
+        client = super().options(**kwargs)
+        client.retry = self.retry if max_retries is None else dataclasses.replace(self.retry, max_retries=max_retries)
+        return client
+
+    async def perform_request(self, method: str, path: str, **kwargs: Any) -> Any:
+        for attempt in itertools.count():
+            try:
+                return await super().perform_request(method, path, **kwargs)
+            except (ApiError, TransportError) as exc:
+                if attempt >= self.retry.max_retries or not self.retry.retryable(exc):
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(
+                    "%s %s failed (%s); retry %d of %d in %.2fs",
+                    method,
+                    path,
+                    type(exc).__name__,
+                    attempt + 1,
+                    self.retry.max_retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("signal2bug.intake_queue")
+
+# flush(docs) indexes a batch and returns {record_id: error} for items that failed.
+FlushFn = Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+# Bulk item statuses worth retrying; any other per-item failure is rejected for good.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# A create that conflicts: the record was already written, by an earlier run or another worker.
+DUPLICATE_STATUS = 409
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class IntakeQueue:
+    """
+    Write-behind queue for intake records, backed by a local write-ahead log.
+
+    enqueue() appends the record to the WAL (fsynced) before returning, and a background
+    task flushes pending records in batches. Each finished batch appends one ack line listing
+    its record_ids, so on restart replay() picks up exactly what never reached Elasticsearch.
+    The WAL is compacted to the pending records only when the queue empties, or once it is
+    over `compact_bytes` and mostly acked, which keeps draining a backlog linear in its size.
+    Records are created with record_id as _id, which makes a replay of a batch that did land
+    before a crash (or before its ack line) harmless; such conflicts are counted as duplicates.
+
+    The last `recent_size` written record_ids are remembered, so a repeat of a record that
+    has already been flushed can be answered as a duplicate without asking Elasticsearch.
+
+    Each running queue holds an exclusive lock on its WAL, so server workers sharing a data
+    directory each write their own log: `wal_path`, then `wal_path.1`, `wal_path.2`, ...
+    """
+
+    def __init__(
+        self,
+        wal_path: Path,
+        flush: FlushFn,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        fsync: bool = True,
+        recent_size: int = 10_000,
+        compact_bytes: int = 64 << 20,
+    ) -> None:
+        self.wal_path = wal_path
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.fsync = fsync
+        self.recent_size = recent_size
+        self.compact_bytes = compact_bytes
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # WAL line size of each pending record, and the WAL's size and share no longer needed.
+        self._line_bytes: Dict[str, int] = {}
+        self._wal_bytes = 0
+        self._dead_bytes = 0
+        self._wal_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._wal_claim: Optional[IO[str]] = None
+        self.flushed = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.replayed = 0
+        self.consecutive_failures = 0
+        self.last_flush_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.recent_rejections: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._pending
+
+    def get(self, record_id: str) -> Dict[str, Any]:
+        return self._pending[record_id]["doc"]
+
+    def recently_written(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """The doc of a record this queue flushed, or found already written, among the last `recent_size`."""
+        return self._recent.get(record_id)
+
+    def _remember(self, doc: Dict[str, Any]) -> None:
+        self._recent[doc["record_id"]] = doc
+        self._recent.move_to_end(doc["record_id"])
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    def _append_lines(self, lines: List[str]) -> None:
+        with self.wal_path.open("a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _rewrite(self, entries: List[Dict[str, Any]]) -> int:
+        tmp_path = self.wal_path.with_suffix(self.wal_path.suffix + ".tmp")
+        lines = [json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries]
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        tmp_path.replace(self.wal_path)
+        return sum(len(line.encode("utf-8")) for line in lines)
+
+    def _should_compact(self) -> bool:
+        if not self._pending:
+            return self._wal_bytes > 0
+        return self._wal_bytes >= self.compact_bytes and 2 * self._dead_bytes >= self._wal_bytes
+
+    def replay(self) -> int:
+        """Load records left in the WAL by a previous run. A torn final line is skipped."""
+        if not self.wal_path.exists():
+            return 0
+        with self.wal_path.open("rb") as f:
+            for line_number, line in enumerate(f, 1):
+                self._wal_bytes += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable line %d of %s", line_number, self.wal_path)
+                    self._dead_bytes += len(line)
+                    continue
+                if "acked" in entry:
+                    self._dead_bytes += len(line)
+                    for record_id in entry["acked"]:
+                        self._pending.pop(record_id, None)
+                        self._dead_bytes += self._line_bytes.pop(record_id, 0)
+                    continue
+                record_id = entry["doc"]["record_id"]
+                self._pending[record_id] = entry
+                self._dead_bytes += self._line_bytes.get(record_id, 0)
+                self._line_bytes[record_id] = len(line)
+        self.replayed = len(self._pending)
+        return self.replayed
+
+    def _claim_wal(self) -> None:
+        """Lock the first WAL slot no other process holds and write to it from now on."""
+        base = self.wal_path
+        for slot in itertools.count():
+            path = base if slot == 0 else base.with_name(f"{base.name}.{slot}")
+            claim = path.with_name(path.name + ".lock").open("w")
+            try:
+                fcntl.flock(claim, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                claim.close()
+                continue
+            self._wal_claim = claim
+            self.wal_path = path
+            return
+
+    async def start(self) -> None:
+        self.wal_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._wal_claim is None:
+            self._claim_wal()
+        replayed = await asyncio.to_thread(self.replay)
+        if replayed:
+            logger.info("Replaying %d queued intake records from %s", replayed, self.wal_path)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher after one last attempt to drain; anything left stays in the WAL."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except Exception:
+            logger.warning("Intake queue not drained on shutdown; %d records stay in %s", len(self), self.wal_path)
+
+    async def _drain(self) -> None:
+        while self._pending and await self.flush_once():
+            pass
+
+    async def enqueue(self, docs: List[Dict[str, Any]]) -> None:
+        entries = [{"queued_at": _now_iso(), "doc": doc} for doc in docs]
+        lines = [json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries]
+        async with self._wal_lock:
+            await asyncio.to_thread(self._append_lines, lines)
+            for entry, line in zip(entries, lines):
+                record_id = entry["doc"]["record_id"]
+                self._pending[record_id] = entry
+                size = len(line.encode("utf-8"))
+                self._dead_bytes += self._line_bytes.get(record_id, 0)
+                self._line_bytes[record_id] = size
+                self._wal_bytes += size
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def flush_once(self) -> bool:
+        """Send one batch. Returns False when the whole batch failed and should be retried later."""
+        batch = list(self._pending.values())[: self.batch_size]
+        if not batch:
+            return True
+        try:
+            failures = await self._flush([entry["doc"] for entry in batch])
+        except Exception as exc:
+            self.consecutive_failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return False
+
+        acked: List[str] = []
+        for entry in batch:
+            record_id = entry["doc"]["record_id"]
+            error = failures.get(record_id)
+            if error is not None and error.get("status") in RETRYABLE_STATUSES:
+                continue
+            if error is not None and error.get("status") == DUPLICATE_STATUS:
+                self.duplicates += 1
+                self._remember(entry["doc"])
+                logger.info("Intake record %s already existed; not written again", record_id)
+            elif error is not None:
+                self.rejected += 1
+                self.recent_rejections = (self.recent_rejections + [{"record_id": record_id, "error": error}])[-10:]
+                logger.error("Intake record %s rejected by Elasticsearch: %s", record_id, error)
+            else:
+                self.flushed += 1
+                self._remember(entry["doc"])
+            self._pending.pop(record_id, None)
+            acked.append(record_id)
+
+        if acked:
+            await self._ack(acked)
+        self.last_flush_at = _now_iso()
+        if acked:
+            self.consecutive_failures = 0
+            self.last_error = None
+            return True
+        self.consecutive_failures += 1
+        self.last_error = f"{len(batch)} records failed with retryable errors"
+        return False
+
+    async def _ack(self, record_ids: List[str]) -> None:
+        """Mark records done in the WAL: append an ack line, or compact when that is due."""
+        line = json.dumps({"acked": record_ids}, separators=(",", ":")) + "\n"
+        async with self._wal_lock:
+            for record_id in record_ids:
+                self._dead_bytes += self._line_bytes.pop(record_id, 0)
+            if self._should_compact():
+                self._wal_bytes = await asyncio.to_thread(self._rewrite, list(self._pending.values()))
+                self._dead_bytes = 0
+            else:
+                await asyncio.to_thread(self._append_lines, [line])
+                size = len(line.encode("utf-8"))
+                self._wal_bytes += size
+                self._dead_bytes += size
+
+    def _backoff(self) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while self._pending:
+                    if not await self.flush_once():
+                        delay = self._backoff()
+                        logger.warning("Intake flush failed (%s); retrying in %.1fs", self.last_error, delay)
+                        await asyncio.sleep(delay)
+                        break
+                    if len(self._pending) < self.batch_size:
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Intake flusher failed unexpectedly")
+
+    def status(self) -> Dict[str, Any]:
+        oldest = next(iter(self._pending.values()), None)
+        lag = None
+        if oldest is not None:
+            queued_at = datetime.fromisoformat(oldest["queued_at"])
+            lag = round(time.time() - queued_at.timestamp(), 3)
+        return {
+            "queue_depth": len(self._pending),
+            "oldest_queued_at": oldest["queued_at"] if oldest else None,
+            "flush_lag_seconds": lag,
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "replayed_on_start": self.replayed,
+            "consecutive_failures": self.consecutive_failures,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error,
+            "recent_rejections": self.recent_rejections,
+            "wal_path": str(self.wal_path),
+            "wal_bytes": self._wal_bytes,
+        }
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("signal2bug.link_store")
+
+BulkFn = Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+# Per-incident link counts are kept in 5-minute buckets for the last 24 hours, so
+# "signals in the last hour" is a read of one bugs doc rather than a scan of signal_links.
+LINK_BUCKET_MINUTES = 5
+LINK_BUCKET_RETENTION_HOURS = 24
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+LINK_COUNTER_SCRIPT = """
+if (ctx._source.signal_link_count == null) { ctx._source.signal_link_count = 0L; }
+ctx._source.signal_link_count += params.count;
+if (ctx._source.last_signal_at == null || ctx._source.last_signal_at.compareTo(params.last_seen) < 0) {
+  ctx._source.last_signal_at = params.last_seen;
+}
+Map buckets = ctx._source.signal_link_buckets;
+if (buckets == null) { buckets = new HashMap(); ctx._source.signal_link_buckets = buckets; }
+for (def entry : params.buckets.entrySet()) {
+  def current = buckets.get(entry.getKey());
+  buckets.put(entry.getKey(), current == null ? entry.getValue() : current + entry.getValue());
+}
+String oldest = params.oldest_bucket;
+buckets.keySet().removeIf(key -> key.compareTo(oldest) < 0);
+"""
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def bucket_key(linked_at: str) -> str:
+    parsed = _parse(linked_at).astimezone(timezone.utc)
+    floored = parsed.replace(minute=parsed.minute - parsed.minute % LINK_BUCKET_MINUTES, second=0, microsecond=0)
+    return floored.strftime("%Y-%m-%dT%H:%MZ")
+
+
+def count_since(buckets: Dict[str, int], since: datetime) -> int:
+    oldest = bucket_key(_format(since))
+    return sum(count for key, count in buckets.items() if key >= oldest)
+
+
+class _Delta:
+    """Counter changes for one incident that have not reached Elasticsearch yet."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.last_seen: Optional[str] = None
+        self.buckets: Dict[str, int] = defaultdict(int)
+
+    def add(self, linked_at: str, count: int = 1) -> None:
+        self.count += count
+        if self.last_seen is None or _parse(linked_at) > _parse(self.last_seen):
+            self.last_seen = linked_at
+        self.buckets[bucket_key(linked_at)] += count
+
+    def merge(self, other: "_Delta") -> None:
+        self.count += other.count
+        if other.last_seen is not None:
+            if self.last_seen is None or _parse(other.last_seen) > _parse(self.last_seen):
+                self.last_seen = other.last_seen
+        for key, count in other.buckets.items():
+            self.buckets[key] += count
+
+
+class SignalLinkStore:
+    """
+    Buffers signal links and writes them in bulk, together with per-incident counters.
+
+    Each flush sends one _bulk request holding an index action per link for the links
+    index and one scripted update per incident for the bugs index. The update adds the
+    number of links, advances last_signal_at and merges 5-minute link buckets, so
+    however many signals hit an incident between flushes, its bugs doc is written once.
+    Failed items go back into the buffer and are retried with backoff.
+    """
+
+    def __init__(
+        self,
+        links_index: str,
+        bugs_index: str,
+        bulk: BulkFn,
+        batch_size: int = 1000,
+        flush_interval: float = 2.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+    ) -> None:
+        self.links_index = links_index
+        self.bugs_index = bugs_index
+        self._bulk = bulk
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._links: List[Dict[str, Any]] = []
+        self._deltas: Dict[str, _Delta] = {}
+        self._sending: Dict[str, _Delta] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_links = 0
+        self.counter_updates = 0
+        self.dropped = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def add(self, link: Dict[str, Any]) -> None:
+        self._links.append(link)
+        self._deltas.setdefault(link["incident_id"], _Delta()).add(link["linked_at"])
+        if len(self._links) >= self.batch_size:
+            self._wake.set()
+
+    def pending_for(self, incident_id: str) -> Dict[str, Any]:
+        """Counter changes for an incident that are buffered or in a bulk request still in flight."""
+        delta = _Delta()
+        for source in (self._deltas, self._sending):
+            if incident_id in source:
+                delta.merge(source[incident_id])
+        return {"count": delta.count, "last_seen": delta.last_seen, "buckets": dict(delta.buckets)}
+
+    def _operations(self, links: List[Dict[str, Any]], deltas: Dict[str, _Delta]) -> List[Dict[str, Any]]:
+        operations: List[Dict[str, Any]] = []
+        for link in links:
+            operations.append({"index": {"_index": self.links_index, "_id": link["link_id"]}})
+            operations.append(link)
+        oldest = datetime.now(timezone.utc) - timedelta(hours=LINK_BUCKET_RETENTION_HOURS)
+        for incident_id, delta in deltas.items():
+            operations.append({"update": {"_index": self.bugs_index, "_id": incident_id, "retry_on_conflict": 5}})
+            operations.append(
+                {
+                    "script": {
+                        "lang": "painless",
+                        "source": LINK_COUNTER_SCRIPT,
+                        "params": {
+                            "count": delta.count,
+                            "last_seen": delta.last_seen,
+                            "buckets": dict(delta.buckets),
+                            "oldest_bucket": bucket_key(_format(oldest)),
+                        },
+                    }
+                }
+            )
+        return operations
+
+    def _requeue(self, links: List[Dict[str, Any]], deltas: Dict[str, _Delta]) -> None:
+        self._links[:0] = links
+        for incident_id, delta in deltas.items():
+            self._deltas.setdefault(incident_id, _Delta()).merge(delta)
+
+    async def flush_once(self) -> bool:
+        """
+        Send up to batch_size links and all pending counter updates in one bulk request.
+        Returns False when something failed and should be retried later.
+        """
+        if not self._links and not self._deltas:
+            return True
+        links, deltas = self._links[: self.batch_size], self._deltas
+        self._links, self._deltas, self._sending = self._links[self.batch_size :], {}, deltas
+        try:
+            response = await self._bulk(self._operations(links, deltas))
+        except Exception as exc:
+            self._requeue(links, deltas)
+            self.consecutive_failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return False
+        finally:
+            self._sending = {}
+
+        retry_links: List[Dict[str, Any]] = []
+        retry_deltas: Dict[str, _Delta] = {}
+        items = response["items"]
+        for link, item in zip(links, items[: len(links)]):
+            outcome = item["index"]
+            if "error" not in outcome:
+                self.flushed_links += 1
+            elif outcome.get("status") in RETRYABLE_STATUSES:
+                retry_links.append(link)
+            else:
+                self.dropped += 1
+                logger.error("Signal link %s rejected: %s", link["link_id"], outcome["error"])
+        for (incident_id, delta), item in zip(deltas.items(), items[len(links) :]):
+            outcome = item["update"]
+            if "error" not in outcome:
+                self.counter_updates += 1
+            elif outcome.get("status") in RETRYABLE_STATUSES:
+                retry_deltas[incident_id] = delta
+            else:
+                logger.warning("Could not update link counters on %s: %s", incident_id, outcome["error"])
+
+        self._requeue(retry_links, retry_deltas)
+        if retry_links or retry_deltas:
+            self.consecutive_failures += 1
+            self.last_error = f"{len(retry_links)} links and {len(retry_deltas)} counter updates will be retried"
+            return False
+        self.consecutive_failures = 0
+        self.last_error = None
+        return True
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher after a last attempt to flush; links still buffered after that are lost."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except Exception:
+            logger.warning("Signal link buffer not flushed on shutdown")
+        if self._links:
+            logger.warning("Dropping %d buffered signal links on shutdown", len(self._links))
+
+    async def _drain(self) -> None:
+        while (self._links or self._deltas) and await self.flush_once():
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while True:
+                    if await self.flush_once():
+                        if len(self._links) < self.batch_size:
+                            break
+                        continue
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    logger.warning("Signal link flush failed (%s); retrying in %.1fs", self.last_error, delay)
+                    await asyncio.sleep(delay)
+                    break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Signal link flusher failed unexpectedly")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "buffered_links": len(self._links),
+            "incidents_with_pending_counters": len(self._deltas),
+            "flushed_links": self.flushed_links,
+            "counter_updates": self.counter_updates,
+            "dropped": self.dropped,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
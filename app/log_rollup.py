@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+ROLLUP_GRANULARITIES_MINUTES = (1, 5, 15)
+ROLLUP_CHUNK_SIZE = 5_000
+# A bucket is emitted once an event this many minutes past its end has been seen.
+ROLLUP_LATENESS_MINUTES = 5
+ROLLUP_DIMENSIONS = ("service", "endpoint", "release_version", "error_code")
+
+# Log-spaced latency histogram from 1ms to 10 minutes; adjacent edges differ by about 11%,
+# which bounds the error of the reported percentiles.
+LATENCY_EDGES_MS = np.geomspace(1.0, 600_000.0, 128)
+N_LATENCY_BINS = len(LATENCY_EDGES_MS) + 1
+
+ROLLUP_MAPPINGS: Dict[str, Any] = {
+    "properties": {
+        "rollup_id": {"type": "keyword"},
+        "@timestamp": {"type": "date"},
+        "bucket_minutes": {"type": "integer"},
+        "service": {"type": "keyword"},
+        "endpoint": {"type": "keyword"},
+        "release_version": {"type": "keyword"},
+        "error_code": {"type": "keyword"},
+        "events": {"type": "long"},
+        "count": {"type": "long"},
+        "sample_size": {"type": "long"},
+        "error_count": {"type": "double"},
+        "error_rate_percent": {"type": "float"},
+        "latency_avg_ms": {"type": "float"},
+        "latency_p50_ms": {"type": "float"},
+        "latency_p95_ms": {"type": "float"},
+        "latency_p99_ms": {"type": "float"},
+        "latency_max_ms": {"type": "float"},
+        "is_aggregated_record": {"type": "boolean"},
+    }
+}
+
+
+def _epoch_minutes(value: Any) -> int:
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() // 60)
+
+
+def _number(value: Any, default: float) -> float:
+    return default if value is None else float(value)
+
+
+def request_weights(doc: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    Return (requests, errors) represented by one log doc.
+
+    A doc that is already aggregated (sample_size and error_rate_percent set) counts as
+    sample_size requests at that error rate. A raw event counts as one request, and it is an
+    error when status_code >= 500.
+    """
+    if doc.get("sample_size") is not None and doc.get("error_rate_percent") is not None:
+        sample = float(doc["sample_size"])
+        return sample, sample * float(doc["error_rate_percent"]) / 100.0
+    return 1.0, 1.0 if _number(doc.get("status_code"), 0) >= 500 else 0.0
+
+
+def histogram_percentiles(hist: np.ndarray, quantiles: Tuple[float, ...]) -> np.ndarray:
+    """Percentiles per row of a latency histogram, as the upper edge of the bin holding each quantile."""
+    hist = np.atleast_2d(hist)
+    cumulative = np.cumsum(hist, axis=1)
+    totals = cumulative[:, -1:]
+    upper_edges = np.append(LATENCY_EDGES_MS, np.inf)
+    result = np.full((len(hist), len(quantiles)), np.nan)
+    for j, q in enumerate(quantiles):
+        bins = np.argmax(cumulative >= np.maximum(totals * q, 1), axis=1)
+        result[:, j] = upper_edges[bins]
+    result[totals[:, 0] == 0] = np.nan
+    return result
+
+
+class LogRollup:
+    """
+    Streaming per-(service, endpoint, release_version, error_code, time bucket) rollup of log events.
+
+    Events are buffered into chunks and aggregated with NumPy: counts, requests and errors
+    (see request_weights) are summed with bincount and latencies go into a fixed histogram
+    per row. Once the newest event seen is `lateness_minutes` past a bucket's end, the bucket
+    is written as a doc to a temporary spill file and its row is freed, so memory holds only
+    the buckets still open, however many events or buckets there are.
+
+    An event older than that lands in a new partial row for its bucket, emitted under a
+    rollup_id with a `|late<minute>` suffix; sums over a bucket's docs stay exact.
+    """
+
+    def __init__(
+        self,
+        granularities: Tuple[int, ...] = ROLLUP_GRANULARITIES_MINUTES,
+        lateness_minutes: int = ROLLUP_LATENESS_MINUTES,
+    ) -> None:
+        self.granularities = granularities
+        self.lateness_minutes = lateness_minutes
+        self._group_ids: Dict[Tuple[Any, ...], int] = {}
+        self._groups: List[Tuple[Any, ...]] = []
+        # (granularity, group id, bucket start minute, late tag) -> row of the open bucket.
+        self._rows: Dict[Tuple[int, int, int, int], int] = {}
+        self._capacity = 0
+        self._size = 0
+        self._events = np.zeros(0, dtype=np.int64)
+        self._count = np.zeros(0, dtype=np.int64)
+        self._requests = np.zeros(0, dtype=np.float64)
+        self._errors = np.zeros(0, dtype=np.float64)
+        self._latency_sum = np.zeros(0, dtype=np.float64)
+        self._latency_max = np.zeros(0, dtype=np.float64)
+        self._hist = np.zeros((0, N_LATENCY_BINS), dtype=np.int32)
+        # Every bucket ending at or before this minute has been emitted.
+        self._emitted_through: Optional[int] = None
+        self._spill: Optional[IO[str]] = None
+        self.emitted = 0
+        self.observed = 0
+
+    def __len__(self) -> int:
+        return self.emitted + self._size
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, 1024)
+        extra = capacity - self._capacity
+        self._events = np.concatenate([self._events, np.zeros(extra, dtype=np.int64)])
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+        self._requests = np.concatenate([self._requests, np.zeros(extra)])
+        self._errors = np.concatenate([self._errors, np.zeros(extra)])
+        self._latency_sum = np.concatenate([self._latency_sum, np.zeros(extra)])
+        self._latency_max = np.concatenate([self._latency_max, np.zeros(extra)])
+        self._hist = np.vstack([self._hist, np.zeros((extra, N_LATENCY_BINS), dtype=np.int32)])
+        self._capacity = capacity
+
+    def add_chunk(self, docs: List[Dict[str, Any]]) -> None:
+        gids, minutes, counts, requests, errors, latencies = [], [], [], [], [], []
+        for doc in docs:
+            if not doc.get("@timestamp"):
+                continue
+            key = tuple(doc.get(field) for field in ROLLUP_DIMENSIONS)
+            gid = self._group_ids.get(key)
+            if gid is None:
+                gid = self._group_ids[key] = len(self._groups)
+                self._groups.append(key)
+            gids.append(gid)
+            minutes.append(_epoch_minutes(doc["@timestamp"]))
+            counts.append(int(_number(doc.get("count"), 1)))
+            doc_requests, doc_errors = request_weights(doc)
+            requests.append(doc_requests)
+            errors.append(doc_errors)
+            latencies.append(_number(doc.get("latency_ms"), np.nan))
+        if not gids:
+            return
+        self.observed += len(gids)
+
+        gid_arr = np.array(gids, dtype=np.int64)
+        minute_arr = np.array(minutes, dtype=np.int64)
+        count_arr = np.array(counts, dtype=np.int64)
+        request_arr = np.array(requests)
+        error_arr = np.array(errors)
+        latency_arr = np.array(latencies)
+        has_latency = ~np.isnan(latency_arr)
+        latency_bins = np.searchsorted(LATENCY_EDGES_MS, np.nan_to_num(latency_arr))
+
+        for granularity in self.granularities:
+            buckets = minute_arr // granularity * granularity
+            keys = (gid_arr << 32) | buckets
+            unique, inverse = np.unique(keys, return_inverse=True)
+            rows = np.empty(len(unique), dtype=np.int64)
+            for i, combined in enumerate(unique.tolist()):
+                bucket = combined & 0xFFFFFFFF
+                late = self._emitted_through is not None and bucket + granularity <= self._emitted_through
+                row_key = (granularity, combined >> 32, bucket, self._emitted_through if late else 0)
+                row = self._rows.get(row_key)
+                if row is None:
+                    row = self._rows[row_key] = self._size
+                    self._size += 1
+                rows[i] = row
+            self._grow(self._size)
+
+            n = len(unique)
+            self._events[rows] += np.bincount(inverse, minlength=n)
+            self._count[rows] += np.bincount(inverse, weights=count_arr, minlength=n).astype(np.int64)
+            self._requests[rows] += np.bincount(inverse, weights=request_arr, minlength=n)
+            self._errors[rows] += np.bincount(inverse, weights=error_arr, minlength=n)
+            self._latency_sum[rows] += np.bincount(
+                inverse[has_latency], weights=latency_arr[has_latency], minlength=n
+            )
+            chunk_max = np.full(n, 0.0)
+            np.maximum.at(chunk_max, inverse[has_latency], latency_arr[has_latency])
+            self._latency_max[rows] = np.maximum(self._latency_max[rows], chunk_max)
+            flat = inverse[has_latency] * N_LATENCY_BINS + latency_bins[has_latency]
+            hist = np.bincount(flat, minlength=n * N_LATENCY_BINS).reshape(n, N_LATENCY_BINS)
+            self._hist[rows] += hist.astype(np.int32)
+
+        self._emit_closed(int(minute_arr.max()) - self.lateness_minutes)
+
+    def _emit_closed(self, cutoff: int) -> None:
+        """Spill the buckets that end at or before `cutoff` and free their rows."""
+        if self._emitted_through is not None and cutoff <= self._emitted_through:
+            return
+        closed = [(key, row) for key, row in self._rows.items() if key[2] + key[0] <= cutoff]
+        self._emitted_through = cutoff
+        if not closed:
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._spill.writelines(json.dumps(doc, separators=(",", ":")) + "\n" for doc in self._row_docs(closed))
+        self.emitted += len(closed)
+
+        open_rows = [(key, row) for key, row in self._rows.items() if key[2] + key[0] > cutoff]
+        keep = np.array([row for _, row in open_rows], dtype=np.int64)
+        self._size = len(keep)
+        self._rows = {key: i for i, (key, _) in enumerate(open_rows)}
+        for name in ("_events", "_count", "_requests", "_errors", "_latency_sum", "_latency_max", "_hist"):
+            array = getattr(self, name)
+            compacted = np.zeros_like(array)
+            compacted[: self._size] = array[keep]
+            setattr(self, name, compacted)
+
+    def observe(self, docs: Iterable[Dict[str, Any]], chunk_size: int = ROLLUP_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Pass docs through unchanged while aggregating them in chunks."""
+        chunk: List[Dict[str, Any]] = []
+        for doc in docs:
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                self.add_chunk(chunk)
+                chunk = []
+            yield doc
+        if chunk:
+            self.add_chunk(chunk)
+
+    def docs(self) -> Iterator[Dict[str, Any]]:
+        """Every rollup doc: first the spilled ones, then the buckets still open. Consumes the rollup."""
+        if self._spill is not None:
+            self._spill.seek(0)
+            for line in self._spill:
+                yield json.loads(line)
+            self._spill.close()
+            self._spill = None
+        if self._size:
+            yield from self._row_docs(list(self._rows.items()))
+
+    def _row_docs(self, keyed_rows: List[Tuple[Tuple[int, int, int, int], int]]) -> Iterator[Dict[str, Any]]:
+        rows = np.array([row for _, row in keyed_rows], dtype=np.int64)
+        percentiles = histogram_percentiles(self._hist[rows], (0.5, 0.95, 0.99))
+        # The overflow bucket has no upper edge; report the observed max instead.
+        percentiles = np.minimum(percentiles, self._latency_max[rows][:, None])
+        latency_events = self._hist[rows].sum(axis=1)
+
+        for i, ((granularity, gid, minute, late), row) in enumerate(keyed_rows):
+            service, endpoint, release_version, error_code = self._groups[gid]
+            timestamp = datetime.fromtimestamp(minute * 60, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+            rollup_id = f"{granularity}m|{service}|{endpoint}|{release_version}|{error_code}|{timestamp}"
+            requests = float(self._requests[row])
+            p50, p95, p99 = (None if np.isnan(v) else round(float(v), 1) for v in percentiles[i])
+            yield {
+                "rollup_id": f"{rollup_id}|late{late}" if late else rollup_id,
+                "@timestamp": timestamp,
+                "bucket_minutes": granularity,
+                "service": service,
+                "endpoint": endpoint,
+                "release_version": release_version,
+                "error_code": error_code,
+                "events": int(self._events[row]),
+                "count": int(self._count[row]),
+                "sample_size": int(round(requests)),
+                "error_count": round(float(self._errors[row]), 2),
+                "error_rate_percent": round(100.0 * float(self._errors[row]) / requests, 3) if requests else None,
+                "latency_avg_ms": (
+                    round(float(self._latency_sum[row]) / int(latency_events[i]), 1) if latency_events[i] else None
+                ),
+                "latency_p50_ms": p50,
+                "latency_p95_ms": p95,
+                "latency_p99_ms": p99,
+                "latency_max_ms": float(self._latency_max[row]) if latency_events[i] else None,
+                "is_aggregated_record": True,
+            }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+MAPPING_PROFILES = ("standard", "lean")
+PROFILE_META_KEY = "mapping_profile"
+LEAN_SETTINGS = {"index.codec": "best_compression"}
+
+_EXACT_LOOKUP_ONLY = {"type": "keyword", "doc_values": False}
+_MATCH_ONLY_TEXT = {"type": "text", "norms": False, "index_options": "docs"}
+_DISPLAY_ONLY_TEXT = {"type": "text", "index": False}
+
+# Per index, the fields the lean profile maps more cheaply. Everything else keeps its standard mapping.
+# Nothing in the MCP server or the README's ES|QL checks sorts, aggregates, scores or phrase-matches these.
+LEAN_FIELDS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "logs": {
+        # Shown in triage samples and still matchable, but never scored on field length or matched as a phrase.
+        "error_message": _MATCH_ONLY_TEXT,
+        # High-cardinality ids: looked up by exact value, never sorted or aggregated on.
+        "trace_id": _EXACT_LOOKUP_ONLY,
+        "span_id": _EXACT_LOOKUP_ONLY,
+        "request_id": _EXACT_LOOKUP_ONLY,
+        "correlation_id": _EXACT_LOOKUP_ONLY,
+        "user_id_hash": _EXACT_LOOKUP_ONLY,
+        "session_id_hash": _EXACT_LOOKUP_ONLY,
+        # Display only: kept in _source and nothing else.
+        "cart_value": {"type": "float", "index": False, "doc_values": False},
+        "currency": {"type": "keyword", "index": False, "doc_values": False},
+    },
+    "bug_intake_records": {
+        "top_evidence": _DISPLAY_ONLY_TEXT,
+        "missing_information": _DISPLAY_ONLY_TEXT,
+        "recommended_next_step": _DISPLAY_ONLY_TEXT,
+    },
+}
+
+# The parts of a field's `_disk_usage` entry, as reported under `<part>_in_bytes`.
+DISK_USAGE_PARTS = ("stored_fields", "doc_values", "points", "norms", "term_vectors", "knn_vectors")
+
+
+def profile_mappings(index_name: str, mappings: Dict[str, Any], profile: str) -> Dict[str, Any]:
+    """The index's mappings under `profile`; non-standard profiles are recorded in `_meta`."""
+    if profile == "standard":
+        return mappings
+    overrides = LEAN_FIELDS.get(index_name, {})
+    return {
+        **mappings,
+        "_meta": {**mappings.get("_meta", {}), PROFILE_META_KEY: profile},
+        "properties": {**mappings["properties"], **overrides},
+    }
+
+
+def profile_settings(profile: str) -> Dict[str, Any]:
+    return dict(LEAN_SETTINGS) if profile == "lean" else {}
+
+
+def mapped_profile(mappings: Dict[str, Any]) -> str:
+    return mappings.get("_meta", {}).get(PROFILE_META_KEY, "standard")
+
+
+def field_disk_usage(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Per-field byte counts from an `_disk_usage` response, heaviest first.
+
+    A data stream reports each backing index separately; those are summed per field.
+    """
+    fields: Dict[str, Dict[str, Any]] = {}
+    for index_name, usage in response.items():
+        if index_name.startswith("_"):
+            continue
+        for field, parts in usage.get("fields", {}).items():
+            row = fields.setdefault(
+                field, {"field": field, "total": 0, "inverted_index": 0, **dict.fromkeys(DISK_USAGE_PARTS, 0)}
+            )
+            row["total"] += parts.get("total_in_bytes", 0)
+            row["inverted_index"] += parts.get("inverted_index", {}).get("total_in_bytes", 0)
+            for part in DISK_USAGE_PARTS:
+                row[part] += parts.get(f"{part}_in_bytes", 0)
+    return sorted(fields.values(), key=lambda row: row["total"], reverse=True)
+
+
+def describe_override(override: Optional[Dict[str, Any]]) -> str:
+    if not override:
+        return ""
+    changes = []
+    if override.get("index") is False:
+        changes.append("not indexed")
+    if override.get("index_options") == "docs":
+        changes.append("docs only")
+    if override.get("norms") is False:
+        changes.append("no norms")
+    if override.get("doc_values") is False:
+        changes.append("no doc_values")
+    return ", ".join(changes)
+
+
+def lean_savings(row: Dict[str, Any], override: Optional[Dict[str, Any]]) -> int:
+    """
+    Bytes of `row` that the override drops outright.
+
+    Dropping positions and frequencies (`index_options: docs`) shrinks the inverted index by an amount
+    `_disk_usage` does not break out, and the codec change shrinks stored fields; neither is counted.
+    """
+    if not override:
+        return 0
+    saved = 0
+    if override.get("index") is False:
+        saved += row["inverted_index"] + row["points"] + row["norms"]
+    elif override.get("norms") is False:
+        saved += row["norms"]
+    if override.get("doc_values") is False:
+        saved += row["doc_values"]
+    return saved
+
@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
 import os
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from uuid import uuid4
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, ApiError, ConflictError, NotFoundError, TransportError
+from elasticsearch.helpers import async_scan
+import uvicorn
 from fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 
-mcp = FastMCP("Signal2Bug MCP Server")
+from es_client import RetryingAsyncElasticsearch, RetryPolicy
+from intake_queue import IntakeQueue
+from link_store import SignalLinkStore, count_since
+from metrics import CallbackCounter, CallbackGauge, WorkerSnapshots, instrument_tool, registry
+from regression import LOG_EVENT_FIELDS, ROLLUP_EVENT_FIELDS, BinnedLogSeries, score_deployments
+from release_index import RELEASE_FIELDS, ReleaseIntervalIndex, to_epoch_ms
+from response_cache import ResponseCache, source_tags, write_tags
+from signature_index import SIGNATURE_FIELDS, SignatureIndex
+from similarity import SIMILARITY_FIELDS, SimilarityIndex
+
+logger = logging.getLogger("signal2bug.mcp")
 
 
 ELASTIC_URL = os.getenv("ELASTIC_URL")
@@ -16,31 +40,316 @@ ELASTIC_CLOUD_ID = os.getenv("ELASTIC_CLOUD_ID")
 ELASTIC_API_KEY = os.getenv("ELASTIC_API_KEY")
 ELASTIC_USERNAME = os.getenv("ELASTIC_USERNAME")
 ELASTIC_PASSWORD = os.getenv("ELASTIC_PASSWORD")
+ELASTIC_CONNECTIONS_PER_NODE = int(os.getenv("ELASTIC_CONNECTIONS_PER_NODE", "32"))
+ELASTIC_REQUEST_TIMEOUT = float(os.getenv("ELASTIC_REQUEST_TIMEOUT", "30"))
+ELASTIC_MAX_RETRIES = int(os.getenv("ELASTIC_MAX_RETRIES", "3"))
+ELASTIC_RETRY_ON_TIMEOUT = os.getenv("ELASTIC_RETRY_ON_TIMEOUT", "true").lower() == "true"
+ELASTIC_RETRY_BACKOFF_FACTOR = float(os.getenv("ELASTIC_RETRY_BACKOFF_FACTOR", "1.0"))
+ELASTIC_RETRY_BACKOFF_MAX = float(os.getenv("ELASTIC_RETRY_BACKOFF_MAX", "30"))
 BUG_RECORD_INDEX = os.getenv("BUG_RECORD_INDEX", "bug_intake_records")
+BUGS_INDEX = os.getenv("BUGS_INDEX", "bugs")
+RELEASES_INDEX = os.getenv("RELEASES_INDEX", "releases")
+LOGS_INDEX = os.getenv("LOGS_INDEX", "logs")
+LOGS_ROLLUP_INDEX = os.getenv("LOGS_ROLLUP_INDEX", "logs_rollup")
+RUNBOOKS_INDEX = os.getenv("RUNBOOKS_INDEX", "runbooks")
+SIGNAL_LINKS_INDEX = os.getenv("SIGNAL_LINKS_INDEX", "signal_links")
+BUG_INDEX_REFRESH_SECONDS = float(os.getenv("BUG_INDEX_REFRESH_SECONDS", "30"))
+RELEASE_INDEX_REFRESH_SECONDS = float(os.getenv("RELEASE_INDEX_REFRESH_SECONDS", "60"))
+RELEASE_INDEX_LOOKBACK_HOURS = float(os.getenv("RELEASE_INDEX_LOOKBACK_HOURS", "24"))
+REGRESSION_PAGE_SIZE = int(os.getenv("REGRESSION_PAGE_SIZE", "5000"))
+REGRESSION_PIT_KEEP_ALIVE = os.getenv("REGRESSION_PIT_KEEP_ALIVE", "2m")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+INTAKE_WRITE_BEHIND = os.getenv("INTAKE_WRITE_BEHIND", "false").lower() == "true"
+INTAKE_WAL_PATH = Path(
+    os.getenv("INTAKE_WAL_PATH", str(Path(__file__).resolve().parent.parent / "data" / ".intake_wal.ndjson"))
+)
+INTAKE_FLUSH_INTERVAL_SECONDS = float(os.getenv("INTAKE_FLUSH_INTERVAL_SECONDS", "1"))
+INTAKE_FLUSH_BATCH_SIZE = int(os.getenv("INTAKE_FLUSH_BATCH_SIZE", "500"))
+INTAKE_RETRY_BACKOFF_MAX = float(os.getenv("INTAKE_RETRY_BACKOFF_MAX", "60"))
+INTAKE_WAL_FSYNC = os.getenv("INTAKE_WAL_FSYNC", "true").lower() == "true"
+INTAKE_RECENT_IDS = int(os.getenv("INTAKE_RECENT_IDS", "10000"))
+INTAKE_WAL_COMPACT_BYTES = int(os.getenv("INTAKE_WAL_COMPACT_BYTES", str(64 << 20)))
+INTAKE_DEDUP_TIMEOUT_SECONDS = float(os.getenv("INTAKE_DEDUP_TIMEOUT_SECONDS", "1"))
+LINK_FLUSH_INTERVAL_SECONDS = float(os.getenv("LINK_FLUSH_INTERVAL_SECONDS", "2"))
+LINK_FLUSH_BATCH_SIZE = int(os.getenv("LINK_FLUSH_BATCH_SIZE", "1000"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SIZE_SAMPLE_EVERY = max(1, int(os.getenv("METRICS_SIZE_SAMPLE_EVERY", "16")))
+METRICS_DIR = Path(os.getenv("METRICS_DIR", str(Path(__file__).resolve().parent.parent / "data" / ".metrics")))
+METRICS_SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", "5"))
+TRACE_LOG = os.getenv("TRACE_LOG", "false").lower() == "true"
+MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "8"))
+WARMUP_RETRY_BACKOFF_MAX = float(os.getenv("WARMUP_RETRY_BACKOFF_MAX", "30"))
+
+
+registry.enabled = METRICS_ENABLED
+registry.trace = TRACE_LOG
+registry.size_sample_every = METRICS_SIZE_SAMPLE_EVERY
+# With several workers, each shares its metrics through METRICS_DIR so any one can answer a scrape.
+metric_snapshots: Optional[WorkerSnapshots] = (
+    WorkerSnapshots(METRICS_DIR, max_age=3 * METRICS_SNAPSHOT_SECONDS) if MCP_WORKERS > 1 and METRICS_ENABLED else None
+)
 
 
-def _make_client() -> Elasticsearch:
+def _make_client() -> AsyncElasticsearch:
+    options: Dict[str, Any] = {
+        "connections_per_node": ELASTIC_CONNECTIONS_PER_NODE,
+        "request_timeout": ELASTIC_REQUEST_TIMEOUT,
+        # Retries happen in the client, with backoff; the transport would retry back-to-back.
+        "max_retries": 0,
+        "retry": RetryPolicy(
+            max_retries=ELASTIC_MAX_RETRIES,
+            retry_on_timeout=ELASTIC_RETRY_ON_TIMEOUT,
+            backoff_factor=ELASTIC_RETRY_BACKOFF_FACTOR,
+            backoff_max=ELASTIC_RETRY_BACKOFF_MAX,
+        ),
+    }
     if ELASTIC_CLOUD_ID and ELASTIC_API_KEY:
-        return Elasticsearch(cloud_id=ELASTIC_CLOUD_ID, api_key=ELASTIC_API_KEY)
+        return RetryingAsyncElasticsearch(cloud_id=ELASTIC_CLOUD_ID, api_key=ELASTIC_API_KEY, **options)
     if ELASTIC_URL and ELASTIC_API_KEY:
-        return Elasticsearch(ELASTIC_URL, api_key=ELASTIC_API_KEY)
+        return RetryingAsyncElasticsearch(ELASTIC_URL, api_key=ELASTIC_API_KEY, **options)
     if ELASTIC_URL and ELASTIC_USERNAME and ELASTIC_PASSWORD:
-        return Elasticsearch(ELASTIC_URL, basic_auth=(ELASTIC_USERNAME, ELASTIC_PASSWORD))
+        return RetryingAsyncElasticsearch(ELASTIC_URL, basic_auth=(ELASTIC_USERNAME, ELASTIC_PASSWORD), **options)
     raise RuntimeError(
         "Set either (ELASTIC_CLOUD_ID + ELASTIC_API_KEY) or (ELASTIC_URL + ELASTIC_API_KEY) "
         "or (ELASTIC_URL + ELASTIC_USERNAME + ELASTIC_PASSWORD)."
     )
 
 
-es = _make_client()
+_es: Optional[AsyncElasticsearch] = None
+
+
+def get_es() -> AsyncElasticsearch:
+    """
+    The process's Elasticsearch client, created on first use.
+
+    Importing the module connects to nothing, so a worker starts even while the cluster is
+    unreachable or misconfigured; warm-up retries and /readyz reports the error.
+    """
+    global _es
+    if _es is None:
+        _es = _make_client()
+    return _es
+
+
+# (name, refresh coroutine, poll interval in seconds) for in-memory indexes built from Elasticsearch.
+_REFRESHERS: List[Tuple[str, Callable[[], Awaitable[int]], float]] = []
+
+
+async def _poll_forever(name: str, refresh: Callable[[], Awaitable[int]], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changed = await refresh()
+            if changed:
+                logger.info("Refreshed %s with %d changed docs", name, changed)
+        except Exception:
+            logger.exception("Refreshing %s failed; retrying in %ss", name, interval)
+
+
+async def _write_metric_snapshots(snapshots: WorkerSnapshots) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(snapshots.write, registry.samples())
+        except Exception:
+            logger.exception("Writing the metrics snapshot to %s failed", snapshots.path)
+        await asyncio.sleep(METRICS_SNAPSHOT_SECONDS)
+
+
+# Set once _warm_up has finished; /readyz reports it together with _startup.
+_ready = asyncio.Event()
+_startup: Dict[str, Any] = {"started_at": None, "ready_seconds": None, "attempts": 0, "last_error": None}
+
+
+async def _warm_up(server: FastMCP, tasks: List[asyncio.Task]) -> None:
+    """
+    Open pooled connections and load the in-memory indexes, then start polling and mark ready.
+
+    Failures are retried with backoff instead of failing startup, so the worker keeps
+    answering /healthz while Elasticsearch is unreachable. The refreshers do their CPU-heavy
+    indexing in worker threads, so /healthz also stays responsive while a large index loads.
+    """
+    # FastMCP builds its session-state store, importing its key-value backend, on the first HTTP tool
+    # call; that import took ~0.5s of the first request, so pay for it here, off the event loop.
+    await asyncio.to_thread(getattr, server, "_state_store", None)
+    pending = list(_REFRESHERS)
+    delay = 1.0
+    while True:
+        _startup["attempts"] += 1
+        try:
+            # Concurrent requests each check out a connection, which then stays open in the pool.
+            await asyncio.gather(*(get_es().info() for _ in range(WARMUP_CONNECTIONS)))
+            while pending:
+                name, refresh, _ = pending[0]
+                logger.info("Loaded %s with %d docs", name, await refresh())
+                pending.pop(0)
+            break
+        except Exception as exc:
+            _startup["last_error"] = f"{type(exc).__name__}: {exc}"
+            logger.warning("Warm-up failed (%s); retrying in %.0fs", _startup["last_error"], delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_BACKOFF_MAX)
+    for name, refresh, interval in _REFRESHERS:
+        tasks.append(asyncio.create_task(_poll_forever(name, refresh, interval)))
+    _startup.update(ready_seconds=time.perf_counter() - _startup["started_at"], last_error=None)
+    _ready.set()
+    logger.info("Ready in %.2fs after %d warm-up attempts", _startup["ready_seconds"], _startup["attempts"])
+
+
+async def wait_until_ready(timeout: Optional[float] = None) -> None:
+    await asyncio.wait_for(_ready.wait(), timeout)
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    global _es
+    _ready.clear()
+    _startup.update(started_at=time.perf_counter(), ready_seconds=None, attempts=0, last_error=None)
+    tasks: List[asyncio.Task] = []
+    tasks.append(asyncio.create_task(_warm_up(server, tasks)))
+    if metric_snapshots is not None:
+        tasks.append(asyncio.create_task(_write_metric_snapshots(metric_snapshots)))
+    if intake_queue is not None:
+        await intake_queue.start()
+    await link_store.start()
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if intake_queue is not None:
+            await intake_queue.stop()
+        await link_store.stop()
+        if metric_snapshots is not None:
+            metric_snapshots.remove()
+        if _es is not None:
+            await _es.close()
+            _es = None
+
+
+mcp = FastMCP("Signal2Bug MCP Server", lifespan=_lifespan)
+
+
+async def _flush_intake_records(docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create queued records with record_id as _id; returns the per-item errors, 409s included, by record_id."""
+    operations: List[Dict[str, Any]] = []
+    for doc in docs:
+        operations.append({"create": {"_index": BUG_RECORD_INDEX, "_id": doc["record_id"]}})
+        operations.append(doc)
+    response = await get_es().bulk(operations=operations)
+    # A 409 means the record already exists, e.g. from a replayed batch; the queue counts it as a duplicate.
+    return {
+        doc["record_id"]: {"status": outcome["create"].get("status"), "error": outcome["create"]["error"]}
+        for doc, outcome in zip(docs, response["items"])
+        if "error" in outcome["create"]
+    }
+
+
+intake_queue: Optional[IntakeQueue] = (
+    IntakeQueue(
+        INTAKE_WAL_PATH,
+        _flush_intake_records,
+        batch_size=INTAKE_FLUSH_BATCH_SIZE,
+        flush_interval=INTAKE_FLUSH_INTERVAL_SECONDS,
+        backoff_max=INTAKE_RETRY_BACKOFF_MAX,
+        fsync=INTAKE_WAL_FSYNC,
+        recent_size=INTAKE_RECENT_IDS,
+        compact_bytes=INTAKE_WAL_COMPACT_BYTES,
+    )
+    if INTAKE_WRITE_BEHIND
+    else None
+)
+
+
+async def _bulk(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return await get_es().bulk(operations=operations)
+
+
+link_store = SignalLinkStore(
+    SIGNAL_LINKS_INDEX,
+    BUGS_INDEX,
+    _bulk,
+    batch_size=LINK_FLUSH_BATCH_SIZE,
+    flush_interval=LINK_FLUSH_INTERVAL_SECONDS,
+)
+
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+
+
+def _normalize(value: Any, unordered: bool = False) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        items = tuple(_normalize(v) for v in value)
+        return tuple(sorted(set(items), key=repr)) if unordered else items
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def _cached(*sources: str, unordered: Tuple[str, ...] = ()) -> Callable:
+    """
+    Serve a read tool from response_cache, keyed on its normalized arguments.
+
+    `sources` are the indexes the response is built from; writes to them for the same
+    service invalidate the entry. Parameters named in `unordered` are treated as sets.
+    """
+
+    def decorate(fn: Callable[..., Awaitable[Dict[str, Any]]]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (fn.__name__,) + tuple(
+                (name, _normalize(value, name in unordered)) for name, value in bound.arguments.items()
+            )
+            tags = source_tags(sources, _normalize(bound.arguments.get("service")))
+            return await response_cache.get_or_compute(key, tags, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorate
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@mcp.tool
-def create_bug_intake_record(
+REFRESH_POLICIES: Dict[str, Any] = {
+    "none": False,
+    "immediate": True,
+    "wait_for": "wait_for",
+}
+
+
+# UUIDs, ISO timestamps and long hex ids differ between repeats of the same alert.
+_VOLATILE_TOKEN_RE = re.compile(
+    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+    r"|\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(z|[+-]\d{2}:?\d{2})?"
+    r"|\b[0-9a-f]{16,}\b"
+)
+
+
+def signal_fingerprint(
+    source_signal_text: Optional[str],
+    service: Optional[str],
+    endpoint: Optional[str],
+    error_code: Optional[str],
+    release_version: Optional[str],
+) -> str:
+    """Deterministic fingerprint of a signal: same normalized text and scope, same intake record."""
+    text = " ".join(_VOLATILE_TOKEN_RE.sub("#", (source_signal_text or "").lower()).split())
+    parts = [text] + [(value or "").strip().lower() for value in (service, endpoint, error_code, release_version)]
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _build_intake_doc(
     title: str,
     summary: str,
     classification: str,
@@ -52,6 +361,7 @@ def create_bug_intake_record(
     component: Optional[str] = None,
     subsystem: Optional[str] = None,
     endpoint: Optional[str] = None,
+    error_code: Optional[str] = None,
     platform: Optional[str] = None,
     environment: Optional[str] = None,
     region: Optional[str] = None,
@@ -71,22 +381,13 @@ def create_bug_intake_record(
     missing_information: Optional[List[str]] = None,
     labels: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    """
-    Create a structured bug intake record in Elasticsearch.
-
-    Use this tool only when:
-    - the issue is classified as Regression or New issue,
-    - confidence is high,
-    - and no active duplicate exists.
-
-    Do not use this tool for known active duplicates.
-    """
-
-    record_id = f"intake-{uuid4().hex[:12]}"
+    fingerprint = signal_fingerprint(source_signal_text or title, service, endpoint, error_code, release_version)
+    record_id = f"intake-{fingerprint}"
     review_status = "needs_review" if confidence < 85 else "pending_triage_review"
 
-    doc = {
+    return {
         "record_id": record_id,
+        "fingerprint": fingerprint,
         "created_at": _now_iso(),
         "created_by": "signal2bug-agent",
         "agent_version": "v1",
@@ -105,6 +406,7 @@ def create_bug_intake_record(
         "component": component,
         "subsystem": subsystem,
         "endpoint": endpoint,
+        "error_code": error_code,
         "platform": platform,
         "environment": environment,
         "region": region,
@@ -126,38 +428,840 @@ def create_bug_intake_record(
         "labels": labels or [],
     }
 
-    result = es.index(index=BUG_RECORD_INDEX, document=doc, refresh="wait_for")
 
+@mcp.tool
+@instrument_tool
+async def create_bug_intake_record(
+    title: str,
+    summary: str,
+    classification: str,
+    severity: str,
+    confidence: float,
+    likely_owner_team: Optional[str] = None,
+    likely_owner_service: Optional[str] = None,
+    service: Optional[str] = None,
+    component: Optional[str] = None,
+    subsystem: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    error_code: Optional[str] = None,
+    platform: Optional[str] = None,
+    environment: Optional[str] = None,
+    region: Optional[str] = None,
+    release_version: Optional[str] = None,
+    build_number: Optional[str] = None,
+    deployment_id: Optional[str] = None,
+    observed_behavior: Optional[str] = None,
+    expected_behavior: Optional[str] = None,
+    priority: Optional[str] = None,
+    source_signal_type: Optional[str] = None,
+    source_signal_text: Optional[str] = None,
+    duplicate_of: Optional[str] = None,
+    related_incidents: Optional[List[str]] = None,
+    evidence_sources: Optional[List[str]] = None,
+    top_evidence: Optional[List[str]] = None,
+    recommended_next_step: Optional[str] = None,
+    missing_information: Optional[List[str]] = None,
+    labels: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Create a structured bug intake record in Elasticsearch.
+
+    Use this tool only when:
+    - the issue is classified as Regression or New issue,
+    - confidence is high,
+    - and no active duplicate exists.
+
+    Do not use this tool for known active duplicates.
+
+    The record ID is derived from the normalized signal text, service, endpoint, error code
+    and release version. Repeating a call for the same signal, from this or another session,
+    returns status "duplicate" with the existing record instead of creating a second one.
+
+    When the server runs in write-behind mode the record is saved to a local log and
+    returned with status "queued"; it is written to Elasticsearch in the background.
+    Do not call again for a queued record.
+    """
+
+    doc = _build_intake_doc(**locals())
+    fingerprint = doc["fingerprint"]
+
+    inflight = _intake_inflight.get(fingerprint)
+    if inflight is not None:
+        return _duplicate_intake_response(await asyncio.shield(inflight))
+
+    future = asyncio.get_running_loop().create_future()
+    _intake_inflight[fingerprint] = future
+    try:
+        result = await _write_intake_record(doc)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()
+        raise
+    finally:
+        _intake_inflight.pop(fingerprint, None)
+    future.set_result(result)
+    return result
+
+
+# Fingerprint -> pending result of the write in progress, so concurrent duplicates share it.
+_intake_inflight: Dict[str, asyncio.Future] = {}
+
+_EXISTING_RECORD_FIELDS = ["record_id", "created_at", "classification", "severity", "confidence", "review_status"]
+
+
+def _intake_response(status: str, doc: Dict[str, Any], document_id: Optional[str]) -> Dict[str, Any]:
     return {
-        "status": "created",
+        "status": status,
         "index": BUG_RECORD_INDEX,
-        "document_id": result["_id"],
-        "record_id": record_id,
-        "classification": classification,
-        "severity": severity,
-        "confidence": confidence,
-        "review_status": review_status,
+        "document_id": document_id,
+        "record_id": doc["record_id"],
+        "classification": doc.get("classification"),
+        "severity": doc.get("severity"),
+        "confidence": doc.get("confidence"),
+        "review_status": doc.get("review_status"),
+    }
+
+
+def _duplicate_intake_response(existing: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **existing,
+        "status": "duplicate",
+        "existing_status": existing["status"],
+        "note": "An intake record for this signal already exists. No new record was created.",
     }
 
 
+async def _written_intake_records(queue: IntakeQueue, record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Records among `record_ids` that already reached Elasticsearch, by record_id.
+
+    Answered from the queue's memory of recent flushes where possible, otherwise with one
+    realtime mget. If Elasticsearch cannot answer quickly the check is skipped: the write
+    is queued, and a conflict at flush time is counted as a duplicate by the queue.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    unknown: List[str] = []
+    for record_id in record_ids:
+        doc = queue.recently_written(record_id)
+        if doc is None:
+            unknown.append(record_id)
+        else:
+            found[record_id] = doc
+    if not unknown:
+        return found
+    try:
+        response = await get_es().options(request_timeout=INTAKE_DEDUP_TIMEOUT_SECONDS, max_retries=0).mget(
+            index=BUG_RECORD_INDEX, ids=unknown, source_includes=_EXISTING_RECORD_FIELDS
+        )
+    except (ApiError, TransportError) as exc:
+        logger.warning("Skipping the written-record check for %d intake records: %s", len(unknown), exc)
+        return found
+    found.update({hit["_id"]: hit["_source"] for hit in response["docs"] if hit.get("found")})
+    return found
+
+
+async def _write_intake_record(doc: Dict[str, Any]) -> Dict[str, Any]:
+    record_id = doc["record_id"]
+    if intake_queue is not None:
+        if record_id in intake_queue:
+            return _duplicate_intake_response(_intake_response("queued", intake_queue.get(record_id), record_id))
+        written = (await _written_intake_records(intake_queue, [record_id])).get(record_id)
+        if written is not None:
+            return _duplicate_intake_response(_intake_response("created", written, record_id))
+        await intake_queue.enqueue([doc])
+        response = _intake_response("queued", doc, record_id)
+    else:
+        try:
+            result = await get_es().index(
+                index=BUG_RECORD_INDEX, id=record_id, document=doc, op_type="create", refresh="wait_for"
+            )
+        except ConflictError:
+            existing = await get_es().get(index=BUG_RECORD_INDEX, id=record_id, source_includes=_EXISTING_RECORD_FIELDS)
+            return _duplicate_intake_response(_intake_response("created", existing["_source"], existing["_id"]))
+        response = _intake_response("created", doc, result["_id"])
+    response_cache.invalidate(write_tags(BUG_RECORD_INDEX, doc.get("service")))
+    return response
+
+
 @mcp.tool
-def link_signal_to_existing_incident(
+@instrument_tool
+async def create_bug_intake_records_batch(
+    records: List[Dict[str, Any]],
+    refresh: str = "wait_for",
+) -> Dict[str, Any]:
+    """
+    Create many structured bug intake records in a single Elasticsearch bulk request.
+
+    Each item in `records` takes the same fields as `create_bug_intake_record`
+    (title, summary, classification, severity and confidence are required).
+    The same safety rules apply to every item: only Regression or New issue signals
+    with high confidence and no active duplicate. Items whose record already exists, or
+    that repeat an earlier item of the batch, come back with status "duplicate".
+
+    `refresh` controls when the new records become searchable:
+    - "none": on the next scheduled index refresh; the request does not wait for it,
+    - "immediate": force a refresh of the affected shards before the request returns,
+    - "wait_for": block until a scheduled refresh has made them visible.
+    In write-behind mode `refresh` is ignored and items are returned with status "queued".
+    """
+
+    if refresh not in REFRESH_POLICIES:
+        raise ValueError(f"refresh must be one of {sorted(REFRESH_POLICIES)}, got {refresh!r}")
+
+    results: List[Dict[str, Any]] = []
+    operations: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = {}
+
+    for position, record in enumerate(records):
+        try:
+            doc = _build_intake_doc(**record)
+        except TypeError as exc:
+            results.append(
+                {"position": position, "status": "failed", "record_id": None, "document_id": None, "error": str(exc)}
+            )
+            continue
+        item = {
+            "position": position,
+            "status": "created",
+            "record_id": doc["record_id"],
+            "document_id": None,
+            "review_status": doc["review_status"],
+        }
+        results.append(item)
+        if doc["record_id"] in seen:
+            item.update(status="duplicate", document_id=doc["record_id"], duplicate_of_position=seen[doc["record_id"]])
+            continue
+        seen[doc["record_id"]] = position
+        if intake_queue is not None and doc["record_id"] in intake_queue:
+            item.update(status="duplicate", document_id=doc["record_id"])
+            continue
+        pending.append(item)
+        operations.append({"create": {"_index": BUG_RECORD_INDEX, "_id": doc["record_id"]}})
+        operations.append(doc)
+
+    if pending and intake_queue is not None:
+        written = await _written_intake_records(intake_queue, [item["record_id"] for item in pending])
+        for item in pending:
+            if item["record_id"] in written:
+                item.update(status="duplicate", document_id=item["record_id"])
+        queued = [i for i, item in enumerate(pending) if item["record_id"] not in written]
+        pending = [pending[i] for i in queued]
+        operations = [op for i in queued for op in operations[2 * i : 2 * i + 2]]
+
+    if operations and intake_queue is not None:
+        await intake_queue.enqueue(operations[1::2])
+        for item in pending:
+            item["status"], item["document_id"] = "queued", item["record_id"]
+        for service in {doc.get("service") for doc in operations[1::2]}:
+            response_cache.invalidate(write_tags(BUG_RECORD_INDEX, service))
+    elif operations:
+        response = await get_es().bulk(operations=operations, refresh=REFRESH_POLICIES[refresh])
+        for service in {doc.get("service") for doc in operations[1::2]}:
+            response_cache.invalidate(write_tags(BUG_RECORD_INDEX, service))
+        for item, outcome in zip(pending, response["items"]):
+            action = outcome["create"]
+            item["document_id"] = action.get("_id")
+            if action.get("status") == 409:
+                item["status"] = "duplicate"
+            elif "error" in action:
+                item["status"] = "failed"
+                item["error"] = action["error"]
+
+    counts = {status: sum(1 for item in results if item["status"] == status) for status in ("created", "queued")}
+    duplicates = sum(1 for item in results if item["status"] == "duplicate")
+    return {
+        "status": "completed",
+        "index": BUG_RECORD_INDEX,
+        "refresh": refresh,
+        **counts,
+        "duplicates": duplicates,
+        "failed": len(results) - sum(counts.values()) - duplicates,
+        "results": results,
+    }
+
+
+signature_index = SignatureIndex()
+similarity_index = SimilarityIndex()
+_BUG_SOURCE_FIELDS = sorted(set(SIGNATURE_FIELDS) | set(SIMILARITY_FIELDS))
+# Highest _seq_no loaded per (concrete index, shard) of the bugs index, for bugs without updated_at.
+_bug_seq_nos: Dict[Tuple[str, int], int] = {}
+
+
+def _apply_bug_changes(docs: List[Dict[str, Any]]) -> int:
+    """Tokenize and index changed bugs; runs in a worker thread so a large load never stalls the event loop."""
+    changed = signature_index.upsert_many(docs)
+    similarity_index.update(docs)
+    return changed
+
+
+async def _scan_bugs_by_seq_no() -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, int], int]]:
+    """
+    Bugs written since the last scan, found by each shard's _seq_no; returns them with the new per-shard maxima.
+
+    Sequence numbers only order writes within one shard, so each shard is scanned on its own.
+    A concrete index not seen before, e.g. after an alias swap, is scanned in full.
+    """
+    settings = await get_es().indices.get_settings(index=BUGS_INDEX, flat_settings=True)
+    seq_nos: Dict[Tuple[str, int], int] = {}
+    docs: List[Dict[str, Any]] = []
+    for index, body in sorted(settings.items()):
+        for shard in range(int(body["settings"].get("index.number_of_shards", 1))):
+            since = _bug_seq_nos.get((index, shard))
+            query = {"match_all": {}} if since is None else {"range": {"_seq_no": {"gt": since}}}
+            hits = async_scan(
+                get_es(),
+                index=index,
+                preference=f"_shards:{shard}",
+                query={"query": query, "_source": _BUG_SOURCE_FIELDS, "seq_no_primary_term": True},
+            )
+            highest = -1 if since is None else since
+            async for hit in hits:
+                docs.append(hit["_source"])
+                highest = max(highest, hit["_seq_no"])
+            seq_nos[(index, shard)] = highest
+    return docs, seq_nos
+
+
+async def _refresh_bug_indexes() -> int:
+    """
+    Load bugs changed since the last poll (everything on the first call) into the in-memory bug indexes.
+
+    Polls select bugs by updated_at once any loaded bug has one, and by each shard's _seq_no
+    otherwise, so they stay incremental either way.
+    """
+    seq_nos = None
+    if signature_index.watermark is None:
+        docs, seq_nos = await _scan_bugs_by_seq_no()
+    else:
+        query = {"range": {"updated_at": {"gte": signature_index.watermark}}}
+        hits = async_scan(get_es(), index=BUGS_INDEX, query={"query": query, "_source": _BUG_SOURCE_FIELDS})
+        docs = [hit["_source"] async for hit in hits]
+    changed = await asyncio.to_thread(_apply_bug_changes, docs)
+    if seq_nos is not None:
+        _bug_seq_nos.clear()
+        _bug_seq_nos.update(seq_nos)
+    if changed:
+        response_cache.invalidate([BUGS_INDEX])
+    return changed
+
+
+_REFRESHERS.append(("bug indexes", _refresh_bug_indexes, BUG_INDEX_REFRESH_SECONDS))
+
+
+@mcp.tool
+@instrument_tool
+@_cached(BUGS_INDEX, unordered=("error_codes",))
+async def lookup_incidents_by_signature(
+    error_signature: Optional[str] = None,
+    stack_hash: Optional[str] = None,
+    error_codes: Optional[List[str]] = None,
+    service: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    include_resolved: bool = False,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Look up incidents that share an error signature, stack hash, error code or service + endpoint.
+
+    Answers from an in-memory index of the bugs index, so it is the fastest duplicate check.
+    Only active incidents are returned unless include_resolved is true. Each match lists the
+    keys it matched on; error_signature and stack_hash matches rank above error code and
+    endpoint matches.
+    """
+
+    matches = signature_index.lookup(
+        error_signature=error_signature,
+        stack_hash=stack_hash,
+        error_codes=error_codes,
+        service=service,
+        endpoint=endpoint,
+        include_resolved=include_resolved,
+        limit=limit,
+    )
+    return {
+        "status": "ok",
+        "matches": matches,
+        "match_count": len(matches),
+        "indexed_incidents": len(signature_index),
+        "indexed_through": signature_index.watermark,
+    }
+
+
+@mcp.tool
+@instrument_tool
+@_cached(BUGS_INDEX)
+async def find_similar_incidents(
+    source_signal_text: str,
+    top_k: int = 5,
+    service: Optional[str] = None,
+    include_resolved: bool = False,
+    min_score: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Rank historical incidents by text similarity to a raw signal.
+
+    Compares the signal against each incident's title, summary, user_report_text, symptoms
+    and error_message_sample using hashed TF-IDF cosine similarity, computed locally with
+    no Elasticsearch round trip. Scores range from 0 to 1. A high score suggests a likely
+    duplicate, but confirm it with signatures, releases and logs before linking.
+    """
+
+    candidates = similarity_index.search(
+        source_signal_text,
+        top_k=top_k,
+        include_resolved=include_resolved,
+        service=service,
+        min_score=min_score,
+    )
+    return {
+        "status": "ok",
+        "candidates": candidates,
+        "candidate_count": len(candidates),
+        "indexed_incidents": len(similarity_index),
+    }
+
+
+TRIAGE_BUG_FIELDS = [
+    "incident_id",
+    "title",
+    "status",
+    "severity",
+    "priority",
+    "service",
+    "endpoint",
+    "error_signature",
+    "error_codes",
+    "release_version",
+    "owner_team",
+    "workaround",
+    "updated_at",
+]
+TRIAGE_RELEASE_FIELDS = [
+    "release_version",
+    "deployment_id",
+    "build_number",
+    "deployed_at",
+    "environment",
+    "rollout_percentage",
+    "services_changed",
+    "endpoints_changed",
+    "feature_flags_enabled",
+    "risk_level",
+    "owner_team",
+    "rollback_supported",
+    "summary",
+]
+TRIAGE_LOG_SAMPLE_FIELDS = [
+    "@timestamp",
+    "service",
+    "endpoint",
+    "status_code",
+    "error_code",
+    "error_message",
+    "release_version",
+    "deployment_id",
+    "latency_ms",
+]
+TRIAGE_RUNBOOK_FIELDS = [
+    "runbook_id",
+    "title",
+    "service",
+    "trigger_signals",
+    "recommended_actions",
+    "rollback_steps",
+    "requires_human_approval",
+    "owner_team",
+]
+
+
+def _triage_searches(
+    service: Optional[str],
+    endpoint: Optional[str],
+    error_code: Optional[str],
+    environment: Optional[str],
+    since: str,
+    until: str,
+    size: int,
+) -> List[Dict[str, Any]]:
+    """Build the _msearch header/body pairs for bugs, releases, logs and runbooks, in that order."""
+
+    bug_should: List[Dict[str, Any]] = []
+    if service:
+        bug_should.append({"term": {"service": {"value": service, "boost": 1.0}}})
+    if endpoint:
+        bug_should.append({"term": {"endpoint": {"value": endpoint, "boost": 2.0}}})
+    if error_code:
+        bug_should.append({"term": {"error_codes": {"value": error_code, "boost": 3.0}}})
+    bugs = {
+        "size": size,
+        "_source": TRIAGE_BUG_FIELDS,
+        "query": {
+            "bool": {
+                "must_not": [{"terms": {"status": ["Resolved", "Closed"]}}],
+                "should": bug_should,
+                "minimum_should_match": 1 if bug_should else 0,
+            }
+        },
+        "sort": ["_score", {"updated_at": {"order": "desc", "unmapped_type": "date"}}],
+    }
+
+    window = {"range": {"deployed_at": {"gte": since, "lte": until}}}
+    release_filter: List[Dict[str, Any]] = [window]
+    if service:
+        release_filter.append({"term": {"services_changed": service}})
+    if environment:
+        release_filter.append({"term": {"environment": environment}})
+    releases = {
+        "size": size,
+        "_source": TRIAGE_RELEASE_FIELDS,
+        "query": {"bool": {"filter": release_filter}},
+        "sort": [{"deployed_at": {"order": "desc"}}],
+    }
+
+    log_filter: List[Dict[str, Any]] = [{"range": {"@timestamp": {"gte": since, "lte": until}}}]
+    for field, value in (("service", service), ("endpoint", endpoint), ("environment", environment)):
+        if value:
+            log_filter.append({"term": {field: value}})
+    if error_code:
+        log_filter.append({"term": {"error_code": error_code}})
+    logs = {
+        "size": 3,
+        "_source": TRIAGE_LOG_SAMPLE_FIELDS,
+        "query": {"bool": {"filter": log_filter}},
+        "sort": [{"@timestamp": {"order": "desc"}}],
+        "aggs": {
+            "errors": {"filter": {"range": {"status_code": {"gte": 500}}}},
+            "total_count": {"sum": {"field": "count"}},
+            "avg_error_rate": {"avg": {"field": "error_rate_percent"}},
+            "max_latency": {"max": {"field": "latency_ms"}},
+            "first_seen": {"min": {"field": "@timestamp"}},
+            "by_error_code": {"terms": {"field": "error_code", "size": 5}},
+            "by_release": {
+                "terms": {"field": "release_version", "size": 5},
+                "aggs": {"count": {"sum": {"field": "count"}}},
+            },
+        },
+    }
+
+    runbook_should: List[Dict[str, Any]] = []
+    if service:
+        runbook_should.append({"term": {"service": {"value": service, "boost": 2.0}}})
+        runbook_should.append({"term": {"related_services": service}})
+    if error_code:
+        runbook_should.append({"term": {"trigger_signals": {"value": error_code, "boost": 3.0}}})
+    runbooks = {
+        "size": min(size, 3),
+        "_source": TRIAGE_RUNBOOK_FIELDS,
+        "query": {"bool": {"should": runbook_should, "minimum_should_match": 1 if runbook_should else 0}},
+    }
+
+    return [
+        {"index": BUGS_INDEX},
+        bugs,
+        {"index": RELEASES_INDEX},
+        releases,
+        {"index": LOGS_INDEX},
+        logs,
+        {"index": RUNBOOKS_INDEX},
+        runbooks,
+    ]
+
+
+def _sources(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [hit["_source"] for hit in response.get("hits", {}).get("hits", [])]
+
+
+def _log_evidence(response: Dict[str, Any]) -> Dict[str, Any]:
+    aggs = response.get("aggregations", {})
+    return {
+        "matching_events": response.get("hits", {}).get("total", {}).get("value", 0),
+        "server_error_events": aggs.get("errors", {}).get("doc_count", 0),
+        "total_count": aggs.get("total_count", {}).get("value"),
+        "avg_error_rate_percent": aggs.get("avg_error_rate", {}).get("value"),
+        "max_latency_ms": aggs.get("max_latency", {}).get("value"),
+        "first_seen": aggs.get("first_seen", {}).get("value_as_string"),
+        "top_error_codes": [
+            {"error_code": b["key"], "events": b["doc_count"]} for b in aggs.get("by_error_code", {}).get("buckets", [])
+        ],
+        "by_release_version": [
+            {"release_version": b["key"], "events": b["doc_count"], "count": b["count"]["value"]}
+            for b in aggs.get("by_release", {}).get("buckets", [])
+        ],
+        "samples": _sources(response),
+    }
+
+
+@mcp.tool
+@instrument_tool
+@_cached(BUGS_INDEX, RELEASES_INDEX, LOGS_INDEX, RUNBOOKS_INDEX)
+async def get_triage_context(
+    service: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    error_code: Optional[str] = None,
+    environment: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    window_hours: float = 24,
+    size: int = 5,
+) -> Dict[str, Any]:
+    """
+    Gather the triage context for a signal in one call: active incidents, releases deployed
+    in the time window, aggregated log evidence and applicable runbooks.
+
+    All four lookups go to Elasticsearch as a single multi-search. `since`/`until` are ISO
+    timestamps or date math; when omitted the window is the last `window_hours` hours.
+    Results are trimmed to the fields needed for triage. Use the individual search tools
+    when more detail is required.
+    """
+
+    since = since or f"now-{int(window_hours * 60)}m"
+    until = until or "now"
+    response = await get_es().msearch(
+        searches=_triage_searches(service, endpoint, error_code, environment, since, until, size)
+    )
+    bugs, releases, logs, runbooks = response["responses"]
+
+    errors = {
+        name: part["error"].get("reason", part["error"]) if isinstance(part["error"], dict) else part["error"]
+        for name, part in (("bugs", bugs), ("releases", releases), ("logs", logs), ("runbooks", runbooks))
+        if "error" in part
+    }
+    return {
+        "status": "ok" if not errors else "partial",
+        "window": {"since": since, "until": until},
+        "active_incidents": _sources(bugs),
+        "releases_in_window": _sources(releases),
+        "log_evidence": _log_evidence(logs),
+        "runbooks": _sources(runbooks),
+        "errors": errors,
+    }
+
+
+release_index = ReleaseIntervalIndex()
+
+
+async def _refresh_release_index() -> int:
+    """
+    Load releases that started within the lookback window before the newest known start.
+
+    Releases have no updated_at, so the lookback also picks up rollouts that changed
+    after they were first seen.
+    """
+    if release_index.watermark is None:
+        query: Dict[str, Any] = {"match_all": {}}
+    else:
+        since = f"{release_index.watermark}||-{int(RELEASE_INDEX_LOOKBACK_HOURS * 60)}m"
+        query = {
+            "bool": {
+                "should": [
+                    {"range": {"deployment_started_at": {"gte": since}}},
+                    {"range": {"deployed_at": {"gte": since}}},
+                ],
+                "minimum_should_match": 1,
+            }
+        }
+    hits = async_scan(get_es(), index=RELEASES_INDEX, query={"query": query, "_source": RELEASE_FIELDS})
+    changed = release_index.upsert_many([hit["_source"] async for hit in hits])
+    if changed:
+        response_cache.invalidate([RELEASES_INDEX])
+    return changed
+
+
+_REFRESHERS.append(("release index", _refresh_release_index, RELEASE_INDEX_REFRESH_SECONDS))
+
+
+@mcp.tool
+@instrument_tool
+@_cached(RELEASES_INDEX)
+async def correlate_release(
+    service: str,
+    timestamps: List[str],
+    environment: str = "prod",
+) -> Dict[str, Any]:
+    """
+    For each timestamp, return the deployment of `service` that was live in `environment`
+    at that moment, and the deployment before it.
+
+    Pass log @timestamp values (ISO 8601) to check whether errors began after a specific
+    deploy. Each match includes the release version, rollout percentage, whether the
+    rollout was still in progress, minutes since the deploy started, and what it changed
+    (endpoints, components, config, flags). Answers from an in-memory index of the
+    releases index, with no Elasticsearch round trip.
+    """
+
+    try:
+        correlations = release_index.active_at(service, environment, timestamps)
+    except ValueError as exc:
+        raise ValueError(f"timestamps must be ISO 8601 strings: {exc}") from exc
+    return {
+        "status": "ok",
+        "service": service,
+        "environment": environment,
+        "correlations": correlations,
+        "indexed_releases": len(release_index),
+    }
+
+
+async def _stream_pages(index: str, query: Dict[str, Any], source: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of _source dicts in @timestamp order using a point in time and search_after.
+
+    The next page is requested while the caller processes the current one. The PIT is
+    closed even when the caller stops early or fails.
+    """
+    pit_id = (await get_es().open_point_in_time(index=index, keep_alive=REGRESSION_PIT_KEEP_ALIVE))["id"]
+    body: Dict[str, Any] = {
+        "size": REGRESSION_PAGE_SIZE,
+        "query": query,
+        "_source": source,
+        "sort": [{"@timestamp": {"order": "asc"}}, {"_shard_doc": {"order": "asc"}}],
+        "track_total_hits": False,
+    }
+
+    async def fetch(search_after: Optional[List[Any]], pit: str) -> Dict[str, Any]:
+        extra = {"search_after": search_after} if search_after else {}
+        return await get_es().search(pit={"id": pit, "keep_alive": REGRESSION_PIT_KEEP_ALIVE}, **body, **extra)
+
+    pending: Optional[asyncio.Task] = asyncio.ensure_future(fetch(None, pit_id))
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            if not hits:
+                break
+            if len(hits) == REGRESSION_PAGE_SIZE:
+                pending = asyncio.ensure_future(fetch(hits[-1]["sort"], pit_id))
+            yield [hit["_source"] for hit in hits]
+    finally:
+        if pending is not None:
+            pending.cancel()
+        await get_es().close_point_in_time(id=pit_id)
+
+
+@mcp.tool
+@instrument_tool
+@_cached(RELEASES_INDEX, LOGS_INDEX, LOGS_ROLLUP_INDEX)
+async def detect_post_release_regression(
+    service: str,
+    endpoint: Optional[str] = None,
+    environment: str = "prod",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    window_hours: float = 168,
+    baseline_minutes: int = 60,
+    source: str = "logs",
+) -> Dict[str, Any]:
+    """
+    Check every deployment of `service` between `since` and `until` for a regression by
+    comparing the `baseline_minutes` before each deploy with the same period after it.
+
+    For each deployment returns error rate and latency p50/p95 before and after, the
+    two-proportion z score and Cohen's h effect size of the error-rate change, a change-point
+    score with the time the shift was detected, the error codes whose rate rose, and a
+    `regression_suspected` flag. `since`/`until` are ISO timestamps; when omitted the window
+    is the last `window_hours` hours. source="rollup" reads the 1-minute logs_rollup buckets
+    instead of raw logs, which is much faster but ignores `environment`.
+
+    Only the baseline windows around each deploy are queried. Their events are streamed page
+    by page into bins aligned to each deploy time, so memory does not depend on how many
+    events the windows hold.
+    """
+
+    if source not in ("logs", "rollup"):
+        raise ValueError("source must be one of: logs, rollup")
+    until_dt = datetime.fromisoformat(until.replace("Z", "+00:00")) if until else datetime.now(timezone.utc)
+    if until_dt.tzinfo is None:
+        until_dt = until_dt.replace(tzinfo=timezone.utc)
+    until = until_dt.isoformat().replace("+00:00", "Z")
+    since = since or (until_dt - timedelta(hours=window_hours)).isoformat().replace("+00:00", "Z")
+
+    deployments = release_index.deployments_between(service, environment, since, until)
+    window = {"since": since, "until": until}
+    if not deployments:
+        return {"status": "no_deployments", "service": service, "environment": environment, "window": window}
+
+    baseline_ms = baseline_minutes * 60_000
+    starts = [to_epoch_ms(d.get("deployment_started_at") or d.get("deployed_at")) for d in deployments]
+    series = BinnedLogSeries(starts, baseline_ms)
+    # Only the baseline windows around each deploy are read, not the whole span between deploys.
+    window_filter = {
+        "bool": {
+            "should": [{"range": {"@timestamp": {"gte": lo, "lt": hi}}} for lo, hi in series.windows()],
+            "minimum_should_match": 1,
+        }
+    }
+    log_filter: List[Dict[str, Any]] = [window_filter, {"term": {"service": service}}]
+    if endpoint:
+        log_filter.append({"term": {"endpoint": endpoint}})
+    if source == "rollup":
+        index, fields = LOGS_ROLLUP_INDEX, ROLLUP_EVENT_FIELDS
+        log_filter.append({"term": {"bucket_minutes": 1}})
+    else:
+        index, fields = LOGS_INDEX, LOG_EVENT_FIELDS
+        log_filter.append({"term": {"environment": environment}})
+
+    async for page in _stream_pages(index, {"bool": {"filter": log_filter}}, fields):
+        await asyncio.to_thread(series.add_docs, page, source == "rollup")
+
+    return {
+        "status": "ok",
+        "service": service,
+        "endpoint": endpoint,
+        "environment": environment,
+        "window": window,
+        "source": source,
+        "events_scanned": series.events,
+        "bin_minutes": round(series.bin_ms / 60_000, 2),
+        "deployments": score_deployments(series, deployments),
+    }
+
+
+@mcp.tool
+@instrument_tool
+async def link_signal_to_existing_incident(
     existing_incident_id: str,
     source_signal_text: str,
     summary: Optional[str] = None,
     confidence: Optional[float] = None,
+    error_code: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Return a structured link result when a new signal is determined to be a duplicate of an active incident.
+    Record that a new signal is a duplicate of an active incident.
 
-    This tool does not create a new bug record. It returns a normalized confirmation payload
-    that can be logged by the caller or attached to the existing incident in an external system.
+    This tool does not create a new bug record. The link is saved to the signal_links index
+    and counted on the incident (signal_link_count, last_signal_at), so link volume can be
+    used as evidence later; see get_incident_signal_stats. Links are written in batches a
+    few seconds after the call returns.
     """
 
+    incident = signature_index.get(existing_incident_id) or {}
+    linked_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    service, endpoint = incident.get("service"), incident.get("endpoint")
+    link = {
+        "link_id": f"link-{uuid4().hex[:12]}",
+        "incident_id": existing_incident_id,
+        "linked_at": linked_at,
+        "service": service,
+        "endpoint": endpoint,
+        "error_code": error_code,
+        "fingerprint": signal_fingerprint(source_signal_text, service, endpoint, error_code, None),
+        "source_signal_text": source_signal_text,
+        "summary": summary,
+        "confidence": confidence,
+    }
+    link_store.add(link)
+    response_cache.invalidate(write_tags(BUGS_INDEX, service))
     return {
         "status": "linked",
+        "link_id": link["link_id"],
         "existing_incident_id": existing_incident_id,
-        "linked_at": _now_iso(),
+        "linked_at": linked_at,
         "summary": summary,
         "confidence": confidence,
         "source_signal_text": source_signal_text,
@@ -165,6 +1269,157 @@ def link_signal_to_existing_incident(
     }
 
 
+@mcp.tool
+@instrument_tool
+async def get_incident_signal_stats(incident_id: str, window_minutes: int = 60) -> Dict[str, Any]:
+    """
+    Report how many signals have been linked to an incident: in total, within the last
+    `window_minutes` (at 5-minute resolution, up to 24 hours) and when the last one arrived.
+
+    Reads the counters kept on the incident's bugs document, plus links still waiting to be
+    written, so it costs one document lookup however many links there are.
+    """
+
+    try:
+        doc = await get_es().get(
+            index=BUGS_INDEX,
+            id=incident_id,
+            source_includes=["title", "status", "signal_link_count", "last_signal_at", "signal_link_buckets"],
+        )
+        source = doc["_source"]
+    except NotFoundError:
+        return {"status": "not_found", "incident_id": incident_id}
+
+    pending = link_store.pending_for(incident_id)
+    buckets = dict(source.get("signal_link_buckets") or {})
+    for key, count in pending["buckets"].items():
+        buckets[key] = buckets.get(key, 0) + count
+    last_signal_at = max(filter(None, [source.get("last_signal_at"), pending["last_seen"]]), default=None)
+    since = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    return {
+        "status": "ok",
+        "incident_id": incident_id,
+        "title": source.get("title"),
+        "incident_status": source.get("status"),
+        "signal_link_count": (source.get("signal_link_count") or 0) + pending["count"],
+        "signals_in_window": count_since(buckets, since),
+        "window_minutes": window_minutes,
+        "last_signal_at": last_signal_at,
+        "buffered_links": pending["count"],
+    }
+
+
+@mcp.tool
+@instrument_tool
+async def get_intake_queue_status() -> Dict[str, Any]:
+    """
+    Report the write-behind intake queue: records waiting to be written (queue depth), how
+    long the oldest has waited (flush lag), totals flushed and rejected, and the last error.
+    Returns status "disabled" when the server writes intake records synchronously.
+    """
+
+    if intake_queue is None:
+        return {"status": "disabled", "write_behind": False}
+    return {"status": "ok", "write_behind": True, **intake_queue.status()}
+
+
+@mcp.tool
+@instrument_tool
+async def get_response_cache_stats() -> Dict[str, Any]:
+    """
+    Report the read-tool response cache: entries, hits, misses, hit ratio, evictions,
+    expirations and invalidations since the server started. Use it to size
+    RESPONSE_CACHE_MAX_ENTRIES and RESPONSE_CACHE_TTL_SECONDS.
+    """
+
+    return {"status": "ok", **response_cache.stats()}
+
+
+def _queue_gauges() -> Dict[Tuple[str, ...], float]:
+    values: Dict[Tuple[str, ...], float] = {
+        ("response_cache_entries",): len(response_cache),
+        ("signal_links_buffered",): len(link_store),
+    }
+    if intake_queue is not None:
+        status = intake_queue.status()
+        values[("intake_queue_depth",)] = status["queue_depth"]
+        values[("intake_flush_lag_seconds",)] = status["flush_lag_seconds"] or 0
+    return values
+
+
+def _cache_counters() -> Dict[Tuple[str, ...], float]:
+    stats = response_cache.stats()
+    events = ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations")
+    return {(event,): stats[event] for event in events}
+
+
+registry.register(
+    CallbackGauge("signal2bug_backlog", "Buffered work waiting in the server.", _queue_gauges, ("queue",))
+)
+registry.register(
+    CallbackCounter(
+        "signal2bug_response_cache_events_total", "Response cache events since start.", _cache_counters, ("event",)
+    )
+)
+registry.register(
+    CallbackGauge("signal2bug_ready", "1 once this worker has warmed up, else 0.", lambda: {(): int(_ready.is_set())})
+)
+registry.register(
+    CallbackGauge(
+        "signal2bug_startup_seconds",
+        "Seconds from server start until warm-up finished.",
+        lambda: {(): _startup["ready_seconds"]},
+    )
+)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Every series carries a `worker` (pid) label; with several workers, all of them are served."""
+    others = await asyncio.to_thread(metric_snapshots.read_others) if metric_snapshots is not None else []
+    return PlainTextResponse(registry.render(others), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness: the worker's event loop answers, whatever the state of Elasticsearch."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness: 200 once warm-up has finished, 503 with the last warm-up error until then."""
+    ready = _ready.is_set()
+    body = {
+        "status": "ready" if ready else "warming_up",
+        "pid": os.getpid(),
+        "ready_seconds": _startup["ready_seconds"],
+        "warmup_attempts": _startup["attempts"],
+        "last_error": _startup["last_error"],
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+def create_app() -> Starlette:
+    """
+    ASGI app for multi-worker serving; uvicorn builds one in each worker process.
+
+    The MCP transport is stateless, so consecutive requests of one client session can be
+    served by different workers.
+    """
+    return mcp.http_app(stateless_http=True)
+
+
 if __name__ == "__main__":
     # Exposes an HTTP endpoint at /mcp for use by remote MCP connectors.
-    mcp.run(transport="http", host="0.0.0.0", port=8000)
+    if MCP_WORKERS > 1:
+        uvicorn.run(
+            "mcp_server:create_app",
+            factory=True,
+            app_dir=str(Path(__file__).resolve().parent),
+            host=MCP_HOST,
+            port=MCP_PORT,
+            workers=MCP_WORKERS,
+        )
+    else:
+        mcp.run(transport="http", host=MCP_HOST, port=MCP_PORT)
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from elasticsearch import AsyncElasticsearch
+
+trace_logger = logging.getLogger("signal2bug.trace")
+
+LATENCY_BUCKETS_SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS_BYTES = tuple(float(256 * 4**i) for i in range(9))  # 256 B .. 16 MiB
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _add_label(sample: str, label: str) -> str:
+    """Add `label` (e.g. 'worker="12"') to one sample line of the text exposition format."""
+    brace, space = sample.find("{"), sample.find(" ")
+    if 0 <= brace < space:
+        return f"{sample[: brace + 1]}{label},{sample[brace + 1 :]}"
+    return f"{sample[:space]}{{{label}}}{sample[space:]}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose values are read from `collect` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        collect: Callable[[], Dict[Labels, float]],
+        labelnames: Tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.collect().items())
+            if value is not None
+        ]
+
+
+class CallbackCounter(CallbackGauge):
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS_SECONDS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self, enabled: bool = True, trace: bool = False, size_sample_every: int = 16) -> None:
+        self.enabled = enabled
+        self.trace = trace
+        # Tool responses are serialized to measure their size on one call in this many per tool.
+        self.size_sample_every = size_sample_every
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> Any:
+        """Add `metric`, replacing one of the same name (a worker can import the server module twice)."""
+        self._metrics = [existing for existing in self._metrics if existing.name != metric.name]
+        self._metrics.append(metric)
+        return metric
+
+    def samples(self) -> Dict[str, List[str]]:
+        """Sample lines per metric name, each labelled with this worker's pid."""
+        label = f'worker="{os.getpid()}"'
+        return {metric.name: [_add_label(line, label) for line in metric.samples()] for metric in self._metrics}
+
+    def render(self, others: Iterable[Dict[str, List[str]]] = ()) -> str:
+        """This worker's metrics, followed in each family by the samples of `others` (see WorkerSnapshots)."""
+        workers = [self.samples(), *others]
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            for samples in workers:
+                lines.extend(samples.get(metric.name, ()))
+        return "\n".join(lines) + "\n"
+
+
+class WorkerSnapshots:
+    """
+    Metric samples of all server workers, shared through a directory.
+
+    Each worker process has its own registry, and a scrape reaches whichever worker accepts
+    the connection. So every worker writes its samples to `<pid>.json` here, and /metrics
+    serves its own live samples plus the other workers' latest snapshots. Snapshots older
+    than `max_age` seconds belong to workers that have exited and are skipped.
+    """
+
+    def __init__(self, directory: Path, max_age: float) -> None:
+        self.directory = directory
+        self.max_age = max_age
+        self.path = directory / f"{os.getpid()}.json"
+
+    def write(self, samples: Dict[str, List[str]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(samples), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def read_others(self) -> List[Dict[str, List[str]]]:
+        others = []
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            if path == self.path:
+                continue
+            try:
+                if now - path.stat().st_mtime > self.max_age:
+                    continue
+                others.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return others
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+registry = Registry()
+
+TOOL_SECONDS = registry.register(
+    Histogram("signal2bug_tool_duration_seconds", "Wall time of MCP tool calls.", ("tool",))
+)
+TOOL_ES_SECONDS = registry.register(
+    Histogram("signal2bug_tool_es_seconds", "Time spent in Elasticsearch calls per MCP tool call.", ("tool",))
+)
+TOOL_SERIALIZE_SECONDS = registry.register(
+    Histogram(
+        "signal2bug_tool_serialize_seconds",
+        "Time to serialize an MCP tool response to JSON, on sampled calls.",
+        ("tool",),
+    )
+)
+TOOL_RESPONSE_BYTES = registry.register(
+    Histogram(
+        "signal2bug_tool_response_bytes",
+        "Size of MCP tool responses as JSON, on sampled calls.",
+        ("tool",),
+        buckets=SIZE_BUCKETS_BYTES,
+    )
+)
+TOOL_CALLS = registry.register(
+    Counter("signal2bug_tool_calls_total", "MCP tool calls by outcome.", ("tool", "outcome"))
+)
+TOOL_IN_FLIGHT = registry.register(Gauge("signal2bug_tool_in_flight", "MCP tool calls in progress.", ("tool",)))
+ES_SECONDS = registry.register(
+    Histogram(
+        "signal2bug_es_request_seconds",
+        "Elasticsearch client calls, including request and response serialization.",
+        ("endpoint",),
+    )
+)
+ES_HTTP_SECONDS = registry.register(
+    Histogram(
+        "signal2bug_es_http_seconds",
+        "HTTP round trip of Elasticsearch calls as seen by the transport.",
+        ("endpoint",),
+    )
+)
+ES_REQUESTS = registry.register(
+    Counter("signal2bug_es_requests_total", "Elasticsearch client calls by outcome.", ("endpoint", "outcome"))
+)
+ES_IN_FLIGHT = registry.register(Gauge("signal2bug_es_in_flight", "Elasticsearch calls in progress."))
+
+
+class _CallTrace:
+    """Per tool call accumulator; spans are only kept when trace logging is on."""
+
+    __slots__ = ("es_seconds", "spans")
+
+    def __init__(self, keep_spans: bool) -> None:
+        self.es_seconds = 0.0
+        self.spans: Optional[List[Dict[str, Any]]] = [] if keep_spans else None
+
+
+_current_call: contextvars.ContextVar[Optional[_CallTrace]] = contextvars.ContextVar("signal2bug_call", default=None)
+
+
+def _log_trace(name: str, elapsed: float, call: _CallTrace, details: Dict[str, Any]) -> None:
+    record = {"tool": name, "duration_ms": round(elapsed * 1000, 3), "es_ms": round(call.es_seconds * 1000, 3)}
+    trace_logger.info(json.dumps({**record, **details, "spans": call.spans}))
+
+
+def instrument_tool(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Time a tool, count its calls and in-flight requests, and measure its JSON response.
+
+    Measuring the response means serializing it a second time, so it is done on one call in
+    `registry.size_sample_every` per tool, and on every traced call. When the registry is
+    disabled the wrapper only adds one attribute check per call.
+    """
+    name = fn.__name__
+    calls = itertools.count()
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not registry.enabled:
+            return await fn(*args, **kwargs)
+        call = _CallTrace(registry.trace)
+        token = _current_call.set(call)
+        labels = (name,)
+        TOOL_IN_FLIGHT.inc(labels)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "ok"
+        except Exception as exc:
+            if call.spans is not None:
+                _log_trace(name, time.perf_counter() - started, call, {"outcome": "error", "error": type(exc).__name__})
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_call.reset(token)
+            TOOL_IN_FLIGHT.dec(labels)
+            TOOL_CALLS.inc((name, outcome))
+            TOOL_SECONDS.observe(labels, elapsed)
+            TOOL_ES_SECONDS.observe(labels, call.es_seconds)
+
+        if call.spans is None and next(calls) % registry.size_sample_every:
+            return result
+        serialize_started = time.perf_counter()
+        size = len(json.dumps(result, default=str))
+        serialize_seconds = time.perf_counter() - serialize_started
+        TOOL_SERIALIZE_SECONDS.observe(labels, serialize_seconds)
+        TOOL_RESPONSE_BYTES.observe(labels, size)
+        if call.spans is not None:
+            _log_trace(
+                name,
+                elapsed,
+                call,
+                {"outcome": "ok", "serialize_ms": round(serialize_seconds * 1000, 3), "response_bytes": size},
+            )
+        return result
+
+    return wrapper
+
+
+def _endpoint(path: str, endpoint_id: Optional[str]) -> str:
+    if endpoint_id:
+        return endpoint_id
+    segments = [s for s in path.split("/") if s]
+    named = [s for s in segments if s.startswith("_")]
+    return named[-1].lstrip("_") if named else "info"
+
+
+class InstrumentedAsyncElasticsearch(AsyncElasticsearch):
+    """AsyncElasticsearch that times every API call; helpers and .options() clients are covered too."""
+
+    async def perform_request(self, method: str, path: str, **kwargs: Any) -> Any:
+        if not registry.enabled:
+            return await super().perform_request(method, path, **kwargs)
+        endpoint = _endpoint(path, kwargs.get("endpoint_id"))
+        ES_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        http_seconds = None
+        try:
+            response = await super().perform_request(method, path, **kwargs)
+            outcome = "ok"
+            http_seconds = response.meta.duration
+            return response
+        except Exception as exc:
+            status = getattr(exc, "status_code", None) or getattr(getattr(exc, "meta", None), "status", None)
+            outcome = str(status) if status else type(exc).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            ES_IN_FLIGHT.dec()
+            ES_REQUESTS.inc((endpoint, outcome))
+            ES_SECONDS.observe((endpoint,), elapsed)
+            if http_seconds is not None:
+                ES_HTTP_SECONDS.observe((endpoint,), http_seconds)
+            call = _current_call.get()
+            if call is not None:
+                call.es_seconds += elapsed
+                if call.spans is not None:
+                    span = {"endpoint": endpoint, "ms": round(elapsed * 1000, 3), "outcome": outcome}
+                    if http_seconds is not None:
+                        span["http_ms"] = round(http_seconds * 1000, 3)
+                    call.spans.append(span)
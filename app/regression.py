@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from log_rollup import LATENCY_EDGES_MS, N_LATENCY_BINS, histogram_percentiles, request_weights
+from release_index import to_epoch_ms
+
+MAX_BINS = 4096
+MAX_ERROR_CODES = 64
+OTHER_ERROR_CODE = "_other"
+
+LOG_EVENT_FIELDS = ["@timestamp", "status_code", "error_code", "latency_ms", "sample_size", "error_rate_percent"]
+ROLLUP_EVENT_FIELDS = ["@timestamp", "error_code", "sample_size", "error_count", "events", "latency_p95_ms"]
+
+
+def _iso(epoch_ms: int) -> str:
+    return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class BinnedLogSeries:
+    """
+    Binned requests, errors, per-code errors and latency histograms around each deployment.
+
+    Every deployment gets its own window of `baseline_ms` before and after the deploy, split
+    into bins whose edges line up with the deploy time, so no bin mixes pre- and post-deploy
+    events. Bins are at least a minute wide and there are never more than MAX_BINS in total,
+    so memory depends on the number of deployments, not on how far apart they are or how many
+    events stream in. Events inside the windows of two nearby deployments count in both.
+    """
+
+    def __init__(self, deploy_ms: List[int], baseline_ms: int, max_bins: int = MAX_BINS) -> None:
+        self.deploy_ms = [int(ms) for ms in deploy_ms]
+        self.baseline_ms = max(1, int(baseline_ms))
+        self.bins_per_side = max(1, min(self.baseline_ms // 60_000, max_bins // max(1, 2 * len(self.deploy_ms))))
+        self.bins_per_window = 2 * self.bins_per_side
+        self.bin_ms = self.baseline_ms / self.bins_per_side
+        self.n_bins = max(1, len(self.deploy_ms) * self.bins_per_window)
+        self.requests = np.zeros(self.n_bins)
+        self.errors = np.zeros(self.n_bins)
+        self.latency_hist = np.zeros((self.n_bins, N_LATENCY_BINS), dtype=np.int64)
+        self.code_errors: Dict[str, np.ndarray] = {}
+        self.events = 0
+
+    def windows(self) -> List[Tuple[int, int]]:
+        """The [start, end) epoch-ms ranges the deployment windows cover, merged where they overlap."""
+        merged: List[Tuple[int, int]] = []
+        for deploy in sorted(self.deploy_ms):
+            start, end = deploy - self.baseline_ms, deploy + self.baseline_ms
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _bins(self, timestamps_ms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bin and event position of every (window, event) pair where the event falls in the window."""
+        order = np.argsort(timestamps_ms, kind="stable")
+        ordered = timestamps_ms[order]
+        bins, events = [], []
+        for i, deploy in enumerate(self.deploy_ms):
+            start = deploy - self.baseline_ms
+            lo, hi = np.searchsorted(ordered, [start, deploy + self.baseline_ms])
+            # Integer arithmetic keeps bin self.bins_per_side starting exactly at the deploy.
+            offsets = ordered[lo:hi] - start
+            bins.append(i * self.bins_per_window + offsets * self.bins_per_side // self.baseline_ms)
+            events.append(order[lo:hi])
+        if not bins:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(bins), np.concatenate(events)
+
+    def add_docs(self, docs: Iterable[Dict[str, Any]], rollup: bool = False) -> None:
+        """Vectorized accumulation of one page of raw log docs, or of logs_rollup docs."""
+        timestamps, requests, errors, latencies, latency_weights, codes = [], [], [], [], [], []
+        for doc in docs:
+            if not doc.get("@timestamp"):
+                continue
+            timestamps.append(to_epoch_ms(doc["@timestamp"]))
+            if rollup:
+                requests.append(float(doc.get("sample_size") or 0))
+                errors.append(float(doc.get("error_count") or 0))
+                latencies.append(doc.get("latency_p95_ms"))
+                latency_weights.append(int(doc.get("events") or 1))
+            else:
+                doc_requests, doc_errors = request_weights(doc)
+                requests.append(doc_requests)
+                errors.append(doc_errors)
+                latencies.append(doc.get("latency_ms"))
+                latency_weights.append(1)
+            codes.append(doc.get("error_code") or "NONE")
+        if not timestamps:
+            return
+
+        bins, events = self._bins(np.array(timestamps, dtype=np.int64))
+        self.events += len(np.unique(events))
+        error_arr = np.array(errors)[events]
+        self.requests += np.bincount(bins, weights=np.array(requests)[events], minlength=self.n_bins)
+        self.errors += np.bincount(bins, weights=error_arr, minlength=self.n_bins)
+
+        latency_arr = np.array([np.nan if v is None else float(v) for v in latencies])[events]
+        weights = np.array(latency_weights, dtype=np.int64)[events]
+        has_latency = ~np.isnan(latency_arr)
+        flat = bins[has_latency] * N_LATENCY_BINS + np.searchsorted(LATENCY_EDGES_MS, latency_arr[has_latency])
+        self.latency_hist += np.bincount(
+            flat, weights=weights[has_latency], minlength=self.n_bins * N_LATENCY_BINS
+        ).astype(np.int64).reshape(self.n_bins, N_LATENCY_BINS)
+
+        # Per-code series are capped at MAX_ERROR_CODES; the long tail shares one "_other" series.
+        code_arr = np.array(codes, dtype=object)[events]
+        for code in np.unique(code_arr[error_arr > 0]).tolist():
+            target = code
+            if code not in self.code_errors and len(self.code_errors) >= MAX_ERROR_CODES:
+                target = OTHER_ERROR_CODE
+            mask = code_arr == code
+            series = self.code_errors.setdefault(target, np.zeros(self.n_bins))
+            series += np.bincount(bins[mask], weights=error_arr[mask], minlength=self.n_bins)
+
+    def _summary(self, window: slice) -> Dict[str, Any]:
+        requests = float(self.requests[window].sum())
+        errors = float(self.errors[window].sum())
+        hist = self.latency_hist[window].sum(axis=0)
+        p50, p95 = histogram_percentiles(hist, (0.5, 0.95))[0]
+        return {
+            "requests": round(requests, 1),
+            "errors": round(errors, 1),
+            "error_rate_percent": round(100.0 * errors / requests, 3) if requests else None,
+            "latency_p50_ms": None if np.isnan(p50) else round(float(p50), 1),
+            "latency_p95_ms": None if np.isnan(p95) else round(float(p95), 1),
+        }
+
+    def score_deployment(self, i: int) -> Dict[str, Any]:
+        """
+        Compare the baseline window before the i-th deployment with the same-length window after it.
+
+        - effect size: Cohen's h between the two error rates (0.2 small, 0.5 medium, 0.8 large);
+        - z: two-proportion z statistic of the error-rate change;
+        - change-point score: Welch t statistic of per-bin error rates after vs before, with the
+          bin where the CUSUM of those rates peaks reported as the detected change point.
+        """
+        first = i * self.bins_per_window
+        before = slice(first, first + self.bins_per_side)
+        after = slice(first + self.bins_per_side, first + self.bins_per_window)
+        summary_before, summary_after = self._summary(before), self._summary(after)
+
+        n0, n1 = float(self.requests[before].sum()), float(self.requests[after].sum())
+        e0, e1 = float(self.errors[before].sum()), float(self.errors[after].sum())
+        p0 = e0 / n0 if n0 else 0.0
+        p1 = e1 / n1 if n1 else 0.0
+        pooled = (e0 + e1) / (n0 + n1) if n0 + n1 else 0.0
+        denom = math.sqrt(pooled * (1 - pooled) * (1 / n0 + 1 / n1)) if n0 and n1 and 0 < pooled < 1 else 0.0
+        z = (p1 - p0) / denom if denom else 0.0
+        cohens_h = 2 * math.asin(math.sqrt(min(p1, 1.0))) - 2 * math.asin(math.sqrt(min(p0, 1.0)))
+
+        window = slice(before.start, after.stop)
+        req = self.requests[window]
+        rates = np.divide(self.errors[window], req, out=np.zeros_like(req), where=req > 0)
+        observed = req > 0
+        split = self.bins_per_side
+        rb, ra = rates[:split][observed[:split]], rates[split:][observed[split:]]
+        change_point_score = 0.0
+        if len(rb) > 1 and len(ra) > 1:
+            se = math.sqrt(rb.var(ddof=1) / len(rb) + ra.var(ddof=1) / len(ra))
+            change_point_score = float((ra.mean() - rb.mean()) / se) if se else 0.0
+        detected_at = None
+        if observed.any():
+            cusum = np.cumsum(np.where(observed, rates - rates[observed].mean(), 0.0))
+            peak = int(np.argmax(np.abs(cusum))) + 1
+            detected_at = _iso(round(self.deploy_ms[i] - self.baseline_ms + peak * self.bin_ms))
+
+        affected = []
+        for code, series in self.code_errors.items():
+            c0, c1 = float(series[before].sum()), float(series[after].sum())
+            r0 = c0 / n0 if n0 else 0.0
+            r1 = c1 / n1 if n1 else 0.0
+            if c1 > 0 and r1 > r0:
+                affected.append(
+                    {
+                        "error_code": code,
+                        "errors_before": round(c0, 1),
+                        "errors_after": round(c1, 1),
+                        "rate_change_percent_points": round(100.0 * (r1 - r0), 3),
+                    }
+                )
+        affected.sort(key=lambda item: item["rate_change_percent_points"], reverse=True)
+
+        p95_before, p95_after = summary_before["latency_p95_ms"], summary_after["latency_p95_ms"]
+        latency_ratio = round(p95_after / p95_before, 2) if p95_before and p95_after else None
+        return {
+            "before": summary_before,
+            "after": summary_after,
+            "error_rate_z": round(z, 2),
+            "effect_size_cohens_h": round(cohens_h, 3),
+            "change_point_score": round(change_point_score, 2),
+            "detected_change_at": detected_at,
+            "latency_p95_ratio": latency_ratio,
+            "affected_error_codes": affected[:5],
+            "regression_suspected": bool(
+                (z >= 3 and cohens_h >= 0.1) or (latency_ratio is not None and latency_ratio >= 1.5 and n1 > 0)
+            ),
+        }
+
+
+def score_deployments(series: BinnedLogSeries, deployments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score each deployment; `deployments` must be in the order their start times were given to `series`."""
+    results = []
+    for i, deployment in enumerate(deployments):
+        start = deployment.get("deployment_started_at") or deployment.get("deployed_at")
+        scored: Dict[str, Any] = {
+            "deployment_id": deployment.get("deployment_id"),
+            "release_version": deployment.get("release_version"),
+            "deployment_started_at": start,
+        }
+        scored.update(series.score_deployment(i))
+        results.append(scored)
+    return results
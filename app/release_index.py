@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+RELEASE_FIELDS = [
+    "release_version",
+    "release_name",
+    "build_number",
+    "deployment_id",
+    "release_type",
+    "deployed_at",
+    "deployment_started_at",
+    "deployment_finished_at",
+    "environment",
+    "rollout_strategy",
+    "rollout_percentage",
+    "services_changed",
+    "endpoints_changed",
+    "changed_components",
+    "config_changes",
+    "database_changes",
+    "feature_flags_enabled",
+    "feature_flags_disabled",
+    "risk_level",
+    "breaking_change",
+    "rollback_supported",
+    "owner_team",
+]
+CHANGE_FIELDS = [
+    "endpoints_changed",
+    "changed_components",
+    "config_changes",
+    "database_changes",
+    "feature_flags_enabled",
+    "feature_flags_disabled",
+    "risk_level",
+    "breaking_change",
+    "rollback_supported",
+]
+
+SeriesKey = Tuple[str, str]
+
+
+def to_epoch_ms(value: str) -> int:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _start(doc: Dict[str, Any]) -> Optional[str]:
+    return doc.get("deployment_started_at") or doc.get("deployed_at")
+
+
+def _finish(doc: Dict[str, Any]) -> Optional[str]:
+    return doc.get("deployment_finished_at") or doc.get("deployed_at")
+
+
+class _Series:
+    """Deployments of one (service, environment), sorted by start time."""
+
+    def __init__(self, docs: List[Dict[str, Any]]) -> None:
+        self.docs = sorted(docs, key=lambda d: to_epoch_ms(_start(d)))
+        self.starts = np.array([to_epoch_ms(_start(d)) for d in self.docs], dtype=np.int64)
+
+
+class ReleaseIntervalIndex:
+    """
+    Answers "which deployment was live for a service/environment at time T" by binary search.
+
+    Each deployment is live from its start until the next deployment of the same
+    service/environment starts. Series are re-sorted lazily, and only for the keys an
+    upsert touched.
+    """
+
+    def __init__(self) -> None:
+        self._releases: Dict[str, Dict[str, Any]] = {}
+        self._members: Dict[SeriesKey, Set[str]] = defaultdict(set)
+        self._series: Dict[SeriesKey, _Series] = {}
+        self._dirty: Set[SeriesKey] = set()
+        self.watermark: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._releases)
+
+    @staticmethod
+    def _keys(doc: Dict[str, Any]) -> List[SeriesKey]:
+        services = doc.get("services_changed") or []
+        if isinstance(services, str):
+            services = [services]
+        environment = doc.get("environment") or "unknown"
+        return [(service, environment) for service in services]
+
+    def upsert(self, doc: Dict[str, Any]) -> bool:
+        deployment_id = doc.get("deployment_id")
+        if not deployment_id or not _start(doc):
+            return False
+        projected = {field: doc.get(field) for field in RELEASE_FIELDS}
+        previous = self._releases.get(deployment_id)
+        if previous == projected:
+            return False
+        for key in self._keys(previous or {}):
+            self._members[key].discard(deployment_id)
+            self._dirty.add(key)
+        self._releases[deployment_id] = projected
+        for key in self._keys(projected):
+            self._members[key].add(deployment_id)
+            self._dirty.add(key)
+
+        start = _start(projected)
+        if self.watermark is None or to_epoch_ms(start) > to_epoch_ms(self.watermark):
+            self.watermark = start
+        return True
+
+    def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for doc in docs if self.upsert(doc))
+
+    def _series_for(self, key: SeriesKey) -> Optional[_Series]:
+        if key in self._dirty:
+            self._dirty.discard(key)
+            members = self._members.get(key)
+            if members:
+                self._series[key] = _Series([self._releases[d] for d in members])
+            else:
+                self._series.pop(key, None)
+        return self._series.get(key)
+
+    def deployments_between(self, service: str, environment: str, since: str, until: str) -> List[Dict[str, Any]]:
+        """Deployments of a service/environment that started in [since, until], oldest first."""
+        series = self._series_for((service, environment))
+        if series is None:
+            return []
+        lo = np.searchsorted(series.starts, to_epoch_ms(since), side="left")
+        hi = np.searchsorted(series.starts, to_epoch_ms(until), side="right")
+        return series.docs[lo:hi]
+
+    def active_at(self, service: str, environment: str, timestamps: List[str]) -> List[Dict[str, Any]]:
+        """Resolve the live deployment, and the one before it, for every timestamp in one searchsorted."""
+        series = self._series_for((service, environment))
+        if series is None:
+            return [{"timestamp": ts, "active": None, "previous": None} for ts in timestamps]
+
+        points = np.array([to_epoch_ms(ts) for ts in timestamps], dtype=np.int64)
+        positions = np.searchsorted(series.starts, points, side="right") - 1
+
+        results = []
+        for ts, point, pos in zip(timestamps, points.tolist(), positions.tolist()):
+            if pos < 0:
+                results.append({"timestamp": ts, "active": None, "previous": None})
+                continue
+            active = series.docs[pos]
+            finish = _finish(active)
+            previous = series.docs[pos - 1] if pos > 0 else None
+            results.append(
+                {
+                    "timestamp": ts,
+                    "active": {
+                        "deployment_id": active["deployment_id"],
+                        "release_version": active.get("release_version"),
+                        "build_number": active.get("build_number"),
+                        "deployment_started_at": _start(active),
+                        "deployment_finished_at": finish,
+                        "rollout_percentage": active.get("rollout_percentage"),
+                        "rollout_in_progress": finish is None or point < to_epoch_ms(finish),
+                        "minutes_since_start": round((point - int(series.starts[pos])) / 60000, 1),
+                        "owner_team": active.get("owner_team"),
+                        "changes": {field: active.get(field) for field in CHANGE_FIELDS},
+                    },
+                    "previous": (
+                        {
+                            "deployment_id": previous["deployment_id"],
+                            "release_version": previous.get("release_version"),
+                            "deployment_started_at": _start(previous),
+                        }
+                        if previous
+                        else None
+                    ),
+                }
+            )
+        return results
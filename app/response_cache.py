@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+ANY_SERVICE = "*"
+
+
+def source_tags(sources: Iterable[str], service: Optional[str]) -> FrozenSet[str]:
+    """Tags for a response built from `sources`: "<source>" and "<source>:<service or *>"."""
+    scope = service or ANY_SERVICE
+    return frozenset(tag for source in sources for tag in (source, f"{source}:{scope}"))
+
+
+def write_tags(source: str, service: Optional[str]) -> FrozenSet[str]:
+    """Tags a write to `source` for `service` makes stale: that service and unscoped responses."""
+    if not service:
+        return frozenset([source])
+    return frozenset([f"{source}:{service}", f"{source}:{ANY_SERVICE}"])
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for tool responses, with tag-based invalidation.
+
+    Each entry carries tags naming the indexes it was built from, overall and per service
+    (see source_tags). invalidate() drops every entry sharing a tag.
+    Concurrent misses for the same key share one computation instead of each hitting
+    Elasticsearch. Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, FrozenSet[str], Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[str]) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, frozenset(tags), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, tags: Optional[Iterable[str]] = None) -> int:
+        """Drop entries sharing any of `tags`, or every entry when tags is None."""
+        self._generation += 1
+        if tags is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            wanted = set(tags)
+            stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & wanted]
+            for key in stale:
+                del self._entries[key]
+            dropped = len(stale)
+        self.invalidations += dropped
+        return dropped
+
+    async def get_or_compute(self, key: Hashable, tags: Iterable[str], compute: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await compute()
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only retry when the leader was cancelled, not this caller.
+                if not inflight.cancelled():
+                    raise
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; mark the exception as retrieved.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        # A write that landed while computing may have made this response stale.
+        if generation == self._generation:
+            self.put(key, value, tags)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
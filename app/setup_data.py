@@ -1,14 +1,37 @@
 from __future__ import annotations
 
+import argparse
+import gzip
+import hashlib
+import itertools
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
 
-from elasticsearch import Elasticsearch, helpers
+from elasticsearch import Elasticsearch, NotFoundError, helpers
+
+from log_rollup import ROLLUP_MAPPINGS, LogRollup
+from mapping_profile import (
+    LEAN_FIELDS,
+    MAPPING_PROFILES,
+    describe_override,
+    field_disk_usage,
+    lean_savings,
+    mapped_profile,
+    profile_mappings,
+    profile_settings,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR.parent / "data"
+DATA_DIR = Path(os.getenv("SEED_DATA_DIR", str(BASE_DIR.parent / "data")))
+READ_CHUNK_SIZE = 1 << 16
+PROGRESS_EVERY = 50_000
+SEED_MANIFEST_PATH = Path(os.getenv("SEED_MANIFEST_PATH", str(DATA_DIR / ".seed_manifest.json")))
 
 INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
     "bugs": {
@@ -34,6 +57,7 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "observed_behavior": {"type": "text"},
                 "expected_behavior": {"type": "text"},
                 "error_signature": {"type": "keyword"},
+                "stack_hash": {"type": "keyword"},
                 "error_type": {"type": "keyword"},
                 "error_codes": {"type": "keyword"},
                 "error_message_sample": {"type": "text"},
@@ -79,9 +103,15 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "tags": {"type": "keyword"},
                 "keywords": {"type": "keyword"},
                 "known_issue": {"type": "boolean"},
+                "signal_link_count": {"type": "long"},
+                "last_signal_at": {"type": "date"},
+                "signal_link_buckets": {"type": "object", "enabled": False},
             }
         },
-        "seed_files": ["bugs_expanded.json", "bugs.json"],
+        "id_field": "incident_id",
+        # link_store keeps counters on the bug docs that seed files do not carry; merge rather than replace.
+        "op_type": "update",
+        "seed_files": ["bugs_expanded.ndjson.gz", "bugs_expanded.ndjson", "bugs_expanded.json", "bugs.json"],
     },
     "releases": {
         "mappings": {
@@ -130,7 +160,8 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "known_risks": {"type": "text"},
             }
         },
-        "seed_files": ["releases_expanded.json", "releases.json"],
+        "id_field": "deployment_id",
+        "seed_files": ["releases_expanded.ndjson.gz", "releases_expanded.ndjson", "releases_expanded.json", "releases.json"],
     },
     "logs": {
         "mappings": {
@@ -184,7 +215,34 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "anomaly_flag": {"type": "boolean"},
             }
         },
-        "seed_files": ["logs_expanded.json", "logs.json"],
+        "id_field": "event_id",
+        # Set: the index can be created as a data stream partitioned on this field (--logs-data-stream).
+        "partition_field": "@timestamp",
+        "seed_files": ["logs_expanded.ndjson.gz", "logs_expanded.ndjson", "logs_expanded.json", "logs.json"],
+    },
+    "signal_links": {
+        "mappings": {
+            "properties": {
+                "link_id": {"type": "keyword"},
+                "incident_id": {"type": "keyword"},
+                "linked_at": {"type": "date"},
+                "service": {"type": "keyword"},
+                "endpoint": {"type": "keyword"},
+                "error_code": {"type": "keyword"},
+                "fingerprint": {"type": "keyword"},
+                "source_signal_text": {"type": "text"},
+                "summary": {"type": "text"},
+                "confidence": {"type": "float"},
+            }
+        },
+        "id_field": "link_id",
+        "seed_files": [],
+    },
+    "logs_rollup": {
+        "mappings": ROLLUP_MAPPINGS,
+        "id_field": "rollup_id",
+        "seed_files": [],
+        "rollup_of": "logs",
     },
     "runbooks": {
         "mappings": {
@@ -215,12 +273,14 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "tags": {"type": "keyword"},
             }
         },
+        "id_field": "runbook_id",
         "seed_files": ["runbooks.json"],
     },
     "bug_intake_records": {
         "mappings": {
             "properties": {
                 "record_id": {"type": "keyword"},
+                "fingerprint": {"type": "keyword"},
                 "created_at": {"type": "date"},
                 "created_by": {"type": "keyword"},
                 "agent_version": {"type": "keyword"},
@@ -239,6 +299,7 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "component": {"type": "keyword"},
                 "subsystem": {"type": "keyword"},
                 "endpoint": {"type": "keyword"},
+                "error_code": {"type": "keyword"},
                 "platform": {"type": "keyword"},
                 "environment": {"type": "keyword"},
                 "region": {"type": "keyword"},
@@ -260,6 +321,7 @@ INDEX_CONFIGS: Dict[str, Dict[str, Any]] = {
                 "labels": {"type": "keyword"},
             }
         },
+        "id_field": "record_id",
         "seed_files": ["bug_intake_records.json"],
     },
 }
@@ -285,54 +347,728 @@ def make_client() -> Elasticsearch:
     )
 
 
-def load_docs_for_index(seed_files: List[str]) -> List[Dict[str, Any]]:
+def find_seed_file(seed_files: List[str]) -> Optional[Path]:
     for file_name in seed_files:
         path = DATA_DIR / file_name
         if path.exists():
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-    return []
+            return path
+    return None
+
 
+def _open_seed_file(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
 
-def ensure_index(client: Elasticsearch, index_name: str, mappings: Dict[str, Any]) -> None:
+
+def _iter_json_array(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Decode a top-level JSON array one element at a time, reading fixed-size chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if not started and pos < len(buffer):
+            if buffer[pos] != "[":
+                raise ValueError(f"Expected a JSON array in {f.name}")
+            started = True
+            pos += 1
+            continue
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            try:
+                doc, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield doc
+                pos = end
+                continue
+        if eof:
+            return
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def _iter_ndjson(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_docs_for_index(seed_files: List[str]) -> Iterator[Dict[str, Any]]:
+    """Stream docs from the first existing seed file (.json array, .ndjson or .ndjson.gz)."""
+    path = find_seed_file(seed_files)
+    if path is None:
+        return
+    with _open_seed_file(path) as f:
+        if path.name.endswith((".ndjson", ".ndjson.gz")):
+            yield from _iter_ndjson(f)
+        else:
+            yield from _iter_json_array(f)
+
+
+def with_progress(
+    index_name: str, docs: Iterable[Dict[str, Any]], stats: Dict[str, float]
+) -> Iterator[Dict[str, Any]]:
+    started = time.perf_counter()
+    stats["read"] = 0
+    for doc in docs:
+        stats["read"] += 1
+        if stats["read"] % PROGRESS_EVERY == 0:
+            rate = stats["read"] / max(time.perf_counter() - started, 1e-9)
+            print(f"  {index_name}: {int(stats['read'])} docs read ({rate:,.0f} docs/s)")
+        yield doc
+
+
+def ensure_index(
+    client: Elasticsearch, index_name: str, mappings: Dict[str, Any], settings: Optional[Dict[str, Any]] = None
+) -> bool:
     if client.indices.exists(index=index_name):
         print(f"Index '{index_name}' already exists. Updating mappings...")
         client.indices.put_mapping(index=index_name, properties=mappings["properties"])
-    else:
-        print(f"Creating index '{index_name}'...")
-        client.indices.create(index=index_name, mappings=mappings)
+        return False
+    print(f"Creating index '{index_name}'...")
+    client.indices.create(index=index_name, mappings=mappings, settings=settings or None)
+    return True
 
 
-def to_actions(index_name: str, docs: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
-    for doc in docs:
-        yield {"_index": index_name, "_source": doc}
+DAY_MS = 86_400_000
+DATA_STREAM_INDEX_SORT = {"index.sort.field": ["@timestamp", "service"], "index.sort.order": ["desc", "asc"]}
 
 
-def main() -> None:
-    client = make_client()
-    print("Connected to Elasticsearch")
+def lifecycle_policy(args: argparse.Namespace) -> Dict[str, Any]:
+    """Roll over daily or at the size limit, make rolled indices read-only after two days, delete at retention."""
+    return {
+        "phases": {
+            "hot": {
+                "actions": {
+                    "rollover": {
+                        "max_age": args.logs_rollover_max_age,
+                        "max_primary_shard_size": args.logs_rollover_max_size,
+                    }
+                }
+            },
+            "warm": {"min_age": "2d", "actions": {"readonly": {}, "forcemerge": {"max_num_segments": 1}}},
+            "delete": {"min_age": args.logs_retention, "actions": {"delete": {}}},
+        }
+    }
+
 
-    for index_name, config in INDEX_CONFIGS.items():
-        ensure_index(client, index_name, config["mappings"])
-        docs = load_docs_for_index(config["seed_files"])
-        if docs:
-            print(f"Indexing {len(docs)} docs into '{index_name}'...")
-            success, errors = helpers.bulk(
-                client,
-                to_actions(index_name, docs),
-                refresh="wait_for",
-                raise_on_error=False,
-                request_timeout=120,
+def _is_data_stream(client: Elasticsearch, name: str) -> bool:
+    try:
+        return bool(client.indices.get_data_stream(name=name).get("data_streams"))
+    except NotFoundError:
+        return False
+
+
+def put_data_stream_template(
+    client: Elasticsearch,
+    name: str,
+    mappings: Dict[str, Any],
+    settings: Dict[str, Any],
+    args: argparse.Namespace,
+) -> str:
+    """Create or update the lifecycle policy and index template behind data stream `name`; return their name."""
+    managed_name = f"signal2bug-{name}"
+    client.ilm.put_lifecycle(name=managed_name, policy=lifecycle_policy(args))
+    client.indices.put_index_template(
+        name=managed_name,
+        index_patterns=[name],
+        data_stream={},
+        # Above the built-in logs-*-* template, which does not match this name anyway.
+        priority=500,
+        template={
+            "settings": {**DATA_STREAM_INDEX_SORT, **settings, "index.lifecycle.name": managed_name},
+            "mappings": mappings,
+        },
+    )
+    return managed_name
+
+
+def ensure_data_stream(
+    client: Elasticsearch,
+    name: str,
+    mappings: Dict[str, Any],
+    args: argparse.Namespace,
+    settings: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Create `name` as a data stream backed by an index template and lifecycle policy of the same
+    name plus a "signal2bug-" prefix. Template and policy are updated on every run; the write
+    index gets new mappings, and new settings apply from the next rollover. Older backing indices
+    keep the mappings they were created with.
+    """
+    managed_name = put_data_stream_template(client, name, mappings, settings or {}, args)
+    if client.indices.exists(index=name):
+        if not _is_data_stream(client, name):
+            raise RuntimeError(
+                f"'{name}' already exists as a regular index. Reindex it into a data stream or delete it "
+                "before loading with --logs-data-stream."
             )
-            print(f"  Indexed: {success}")
-            if errors:
-                print(f"  Errors: {len(errors)} (showing first 2)")
-                for err in errors[:2]:
-                    print(json.dumps(err, indent=2))
+        print(f"Data stream '{name}' already exists. Updating mappings...")
+        client.indices.put_mapping(index=name, properties=mappings["properties"], write_index_only=True)
+        return False
+    print(f"Creating data stream '{name}' (policy '{managed_name}')...")
+    client.indices.create_data_stream(name=name)
+    return True
+
+
+def _write_index(client: Elasticsearch, name: str) -> str:
+    return client.indices.get_data_stream(name=name)["data_streams"][0]["indices"][-1]["index_name"]
+
+
+def current_profile(client: Elasticsearch, name: str) -> Optional[str]:
+    """The mapping profile index `name` was created with (its write index, for a data stream), or None if absent."""
+    if not client.indices.exists(index=name):
+        return None
+    if _is_data_stream(client, name):
+        name = _write_index(client, name)
+    response = client.indices.get_mapping(index=name)
+    return mapped_profile(next(iter(response.values()), {}).get("mappings", {}))
+
+
+def _epoch_ms(timestamp: Any) -> int:
+    parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def latest_value(client: Elasticsearch, name: str, field: str) -> Optional[float]:
+    response = client.search(index=name, size=0, aggs={"latest": {"max": {"field": field}}})
+    return response.get("aggregations", {}).get("latest", {}).get("value")
+
+
+def load_data_stream(
+    client: Elasticsearch,
+    name: str,
+    field: str,
+    resume_after_ms: Optional[float],
+    docs: Iterable[Dict[str, Any]],
+    id_field: Optional[str],
+    args: argparse.Namespace,
+    stats: Dict[str, float],
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Bulk-load `docs` into data stream `name`, rolling it over whenever they move into a new UTC day of `field`.
+
+    A data stream always writes to its newest backing index, so a backfill would otherwise
+    land in a single index. With time-ordered seed files each backing index holds one day of
+    events, and searches on a time window skip the other days' shards. Each index gets that day
+    as its lifecycle origination date, so retention counts from event time, not load time.
+
+    Each day is sent as its own bulk load, which has returned, every chunk included, before the
+    stream rolls over; otherwise chunks still buffered by the bulk helpers would land in the
+    next day's index.
+
+    Document ids are only unique per backing index, so when the stream already holds data,
+    docs older than its latest `field` value are skipped rather than written again.
+
+    With --fast, BULK_LOAD_SETTINGS go on each backing index as it becomes the write index,
+    since indices created by a rollover take the template's settings; all of them are restored
+    and refreshed once the load ends.
+    """
+    # The day the write index holds. Days never go backwards: an out-of-order doc joins the current day.
+    current = None if resume_after_ms is None else int(resume_after_ms) // DAY_MS * DAY_MS
+    stats["partitions"] = 0
+    stats["already_loaded"] = 0
+
+    def not_loaded(docs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for doc in docs:
+            value = doc.get(field)
+            if resume_after_ms is not None and value is not None and _epoch_ms(value) < resume_after_ms:
+                stats["already_loaded"] += 1
+                continue
+            yield doc
+
+    latest = current
+
+    def day_of(doc: Dict[str, Any]) -> Optional[int]:
+        nonlocal latest
+        value = doc.get(field)
+        if value is not None:
+            day_ms = _epoch_ms(value) // DAY_MS * DAY_MS
+            if latest is None or day_ms > latest:
+                latest = day_ms
+        return latest
+
+    success = 0
+    errors: List[Dict[str, Any]] = []
+    write_index: Optional[str] = None
+    with ExitStack() as fast_settings:
+        for day_ms, day_docs in itertools.groupby(not_loaded(docs), key=day_of):
+            if day_ms is not None and day_ms != current:
+                if current is None:
+                    # Nothing loaded yet: the stream's first backing index takes the first day.
+                    write_index = _write_index(client, name)
+                else:
+                    write_index = client.indices.rollover(alias=name)["new_index"]
+                client.indices.put_settings(index=write_index, settings={"index.lifecycle.origination_date": day_ms})
+                current = day_ms
+                stats["partitions"] += 1
+                if args.fast:
+                    fast_settings.enter_context(bulk_load_settings(client, write_index))
+            elif write_index is None:
+                write_index = _write_index(client, name)
+                if args.fast:
+                    fast_settings.enter_context(bulk_load_settings(client, write_index))
+            # Data streams only accept creates; a doc already in the stream comes back as a 409.
+            day_success, day_errors = bulk_index(client, to_actions(name, day_docs, id_field, op_type="create"), args)
+            success += day_success
+            errors.extend(day_errors)
+    return success, errors
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    payload = json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path: Path, manifest: Dict[str, Dict[str, str]]) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    tmp_path.replace(path)
+
+
+def select_changed(
+    docs: Iterable[Dict[str, Any]],
+    id_field: Optional[str],
+    known: Dict[str, str],
+    sent: Dict[str, str],
+    stats: Dict[str, float],
+) -> Iterator[Dict[str, Any]]:
+    """Skip docs whose content hash matches the manifest; record hashes of the ones sent."""
+    stats["skipped"] = 0
+    for doc in docs:
+        doc_id = doc.get(id_field) if id_field else None
+        if doc_id is None:
+            yield doc
+            continue
+        digest = content_hash(doc)
+        if known.get(str(doc_id)) == digest:
+            stats["skipped"] += 1
+            continue
+        sent[str(doc_id)] = digest
+        yield doc
+
+
+def to_actions(
+    index_name: str, docs: Iterable[Dict[str, Any]], id_field: Optional[str] = None, op_type: str = "index"
+) -> Iterable[Dict[str, Any]]:
+    for doc in docs:
+        doc_id = doc.get(id_field) if id_field else None
+        if op_type == "update" and doc_id is not None:
+            # Fields the doc does not carry keep their stored values; a new id is created as is.
+            action = {"_op_type": "update", "_index": index_name, "doc": doc, "doc_as_upsert": True}
         else:
+            action = {"_op_type": "index" if op_type == "update" else op_type, "_index": index_name, "_source": doc}
+        if doc_id is not None:
+            action["_id"] = str(doc_id)
+        yield action
+
+
+BULK_LOAD_SETTINGS = {"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+
+
+@contextmanager
+def bulk_load_settings(client: Elasticsearch, index_name: str) -> Iterator[None]:
+    """Disable refresh and replicas for the duration of a load, then restore them and refresh once."""
+    current = client.indices.get_settings(index=index_name, flat_settings=True)
+    # Keyed by the concrete index, which differs from `index_name` once that is an alias (lean-reindex).
+    explicit = next(iter(current.values()), {}).get("settings", {})
+    original = {key: explicit.get(key) for key in BULK_LOAD_SETTINGS}
+    client.indices.put_settings(index=index_name, settings=BULK_LOAD_SETTINGS)
+    try:
+        yield
+    finally:
+        client.indices.put_settings(index=index_name, settings=original)
+        client.indices.refresh(index=index_name)
+        print(f"  Restored {original} on '{index_name}' and refreshed.")
+
+
+def bulk_index(
+    client: Elasticsearch, actions: Iterable[Dict[str, Any]], args: argparse.Namespace
+) -> Tuple[int, List[Dict[str, Any]]]:
+    if not args.fast:
+        return helpers.bulk(
+            client,
+            actions,
+            chunk_size=args.chunk_size,
+            refresh="wait_for",
+            raise_on_error=False,
+            request_timeout=120,
+        )
+
+    success = 0
+    errors: List[Dict[str, Any]] = []
+    for ok, item in helpers.parallel_bulk(
+        client,
+        actions,
+        thread_count=args.threads,
+        chunk_size=args.chunk_size,
+        raise_on_error=False,
+        request_timeout=120,
+    ):
+        if ok:
+            success += 1
+        else:
+            errors.append(item)
+    return success, errors
+
+
+def load_index(
+    client: Elasticsearch,
+    index_name: str,
+    config: Dict[str, Any],
+    args: argparse.Namespace,
+    manifest: Dict[str, Dict[str, str]],
+    source: Optional[Iterable[Dict[str, Any]]] = None,
+    tap: Optional[Callable[[Iterable[Dict[str, Any]]], Iterable[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Create or update one index and bulk-load its docs.
+
+    Docs come from `source` when given, otherwise from the index's seed file. `tap` wraps
+    the doc stream before change detection, so it sees every doc that was read.
+    """
+    result: Dict[str, Any] = {"index": index_name, "read": 0, "indexed": 0, "skipped": 0, "errors": 0, "seconds": 0.0}
+    # An index that is already a data stream keeps being loaded as one, with or without the flag.
+    data_stream = bool(
+        config.get("partition_field") and (args.logs_data_stream or _is_data_stream(client, index_name))
+    )
+    # Like data streams, an existing index keeps the mapping profile it was created with.
+    profile = current_profile(client, index_name) or args.mapping_profile
+    if args.mapping_profile == "lean" and profile != "lean":
+        print(f"'{index_name}' keeps its {profile} mappings; run `setup_data.py lean-reindex {index_name}` to switch.")
+    mappings = profile_mappings(index_name, config["mappings"], profile)
+    if data_stream:
+        created = ensure_data_stream(client, index_name, mappings, args, profile_settings(profile))
+    else:
+        created = ensure_index(client, index_name, mappings, profile_settings(profile))
+    if created:
+        manifest.pop(index_name, None)
+    if source is None:
+        seed_path = find_seed_file(config["seed_files"])
+        if not seed_path:
             print(f"No seed file found for '{index_name}'. Index created with zero documents.")
+            return result
+        print(f"Indexing docs from '{seed_path.name}' into '{index_name}'...")
+        source = iter_docs_for_index(config["seed_files"])
+    else:
+        print(f"Indexing derived docs into '{index_name}'...")
+
+    id_field = config.get("id_field")
+    known = manifest.get(index_name, {})
+    sent: Dict[str, str] = {}
+    stats: Dict[str, float] = {}
+    docs = with_progress(index_name, source, stats)
+    if tap is not None:
+        docs = tap(docs)
+    if args.incremental:
+        docs = select_changed(docs, id_field, known, sent, stats)
+
+    started = time.perf_counter()
+    # A data stream applies the bulk-load settings per backing index as it loads.
+    with bulk_load_settings(client, index_name) if args.fast and not data_stream else nullcontext():
+        if data_stream:
+            resume_after = None if created else latest_value(client, index_name, config["partition_field"])
+            success, errors = load_data_stream(
+                client, index_name, config["partition_field"], resume_after, docs, id_field, args, stats
+            )
+        else:
+            op_type = config.get("op_type", "index")
+            success, errors = bulk_index(client, to_actions(index_name, docs, id_field, op_type), args)
+    elapsed = time.perf_counter() - started
+    if data_stream:
+        existing = [err for err in errors if next(iter(err.values())).get("status") == 409]
+        errors = [err for err in errors if next(iter(err.values())).get("status") != 409]
+        present = len(existing) + int(stats.get("already_loaded", 0))
+        stats["skipped"] = stats.get("skipped", 0) + present
+        partitions = int(stats.get("partitions", 0))
+        print(f"  Routed into {partitions} daily backing indices; {present} docs were already in the stream.")
+
+    rate = success / max(elapsed, 1e-9)
+    read = int(stats.get("read", 0))
+    print(f"  Indexed: {success} of {read} into '{index_name}' in {elapsed:.1f}s ({rate:,.0f} docs/s)")
+    if args.incremental:
+        print(f"  Unchanged (skipped): {int(stats.get('skipped', 0))}")
+    if errors:
+        print(f"  Errors: {len(errors)} (showing first 2)")
+        for err in errors[:2]:
+            print(json.dumps(err, indent=2))
+        for err in errors:
+            sent.pop(str(next(iter(err.values())).get("_id")), None)
+    if args.incremental:
+        known.update(sent)
+        manifest[index_name] = known
+
+    result.update(
+        read=read,
+        indexed=success,
+        skipped=int(stats.get("skipped", 0)),
+        errors=len(errors),
+        seconds=elapsed,
+    )
+    return result
+
+
+def print_summary(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'index':<20} {'read':>12} {'indexed':>12} {'skipped':>12} {'errors':>8} {'seconds':>9} {'docs/s':>12}")
+    for r in results:
+        rate = r["indexed"] / r["seconds"] if r["seconds"] else 0.0
+        print(
+            f"{r['index']:<20} {r['read']:>12,} {r['indexed']:>12,} {r['skipped']:>12,} "
+            f"{r['errors']:>8,} {r['seconds']:>9.1f} {rate:>12,.0f}"
+        )
+
+
+def _human_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
+
+
+def audit_index(client: Elasticsearch, index_name: str, top: int) -> Dict[str, Any]:
+    """Index stats plus the `top` heaviest fields by `_disk_usage`, with what the lean profile would change."""
+    stats = client.indices.stats(index=index_name, metric="docs,store,segments,fielddata")["_all"]
+    usage = client.indices.disk_usage(index=index_name, run_expensive_tasks=True)
+    profile = current_profile(client, index_name)
+    overrides = LEAN_FIELDS.get(index_name, {}) if profile != "lean" else {}
+    fields = field_disk_usage(usage)
+    for row in fields:
+        row["lean"] = describe_override(overrides.get(row["field"]))
+    return {
+        "index": index_name,
+        "profile": profile,
+        "docs": stats["primaries"]["docs"]["count"],
+        "primary_store_bytes": stats["primaries"]["store"]["size_in_bytes"],
+        "total_store_bytes": stats["total"]["store"]["size_in_bytes"],
+        "segments": stats["primaries"]["segments"]["count"],
+        "fielddata_bytes": stats["total"]["fielddata"]["memory_size_in_bytes"],
+        "analyzed_bytes": sum(row["total"] for row in fields),
+        "lean_savings_bytes": sum(lean_savings(row, overrides.get(row["field"])) for row in fields),
+        "heaviest_fields": fields[:top],
+    }
+
+
+def print_audit(reports: List[Dict[str, Any]]) -> None:
+    columns = ("total", "inverted_index", "stored_fields", "doc_values", "points", "norms")
+    for report in reports:
+        print(
+            f"\n{report['index']} ({report['profile']} mappings): {report['docs']:,} docs, "
+            f"{_human_bytes(report['primary_store_bytes'])} primary store "
+            f"({_human_bytes(report['total_store_bytes'])} with replicas), {report['segments']:,} segments, "
+            f"{_human_bytes(report['fielddata_bytes'])} fielddata"
+        )
+        print(f"{'field':<28} " + " ".join(f"{column:>14}" for column in columns) + "  lean profile")
+        for row in report["heaviest_fields"]:
+            sizes = " ".join(f"{_human_bytes(row[column]):>14}" for column in columns)
+            print(f"{row['field']:<28} {sizes}  {row['lean']}")
+        if report["lean_savings_bytes"]:
+            print(
+                f"The lean profile drops at least {_human_bytes(report['lean_savings_bytes'])} of "
+                f"{_human_bytes(report['analyzed_bytes'])}, not counting dropped positions or the codec change. "
+                f"Apply it with `setup_data.py lean-reindex {report['index']}`."
+            )
+
+
+REINDEX_POLL_SECONDS = 10
+
+
+def wait_for_task(client: Elasticsearch, task_id: str) -> Dict[str, Any]:
+    """Poll a background task until it completes, printing its progress, and return its response."""
+    while True:
+        task = client.tasks.get(task_id=task_id)
+        if task.get("completed"):
+            return task.get("response", {})
+        status = task["task"]["status"]
+        copied = status.get("created", 0) + status.get("updated", 0)
+        print(f"  {copied:,} of {status.get('total', 0):,} docs copied")
+        time.sleep(REINDEX_POLL_SECONDS)
+
+
+def lean_reindex(
+    client: Elasticsearch, index_name: str, config: Dict[str, Any], args: argparse.Namespace
+) -> Dict[str, Any]:
+    """
+    Move `index_name` to the lean mapping profile.
+
+    A regular index is copied into a new lean index with `_reindex`. Once the copy holds every
+    doc, a single alias update deletes the old index and points `index_name` at the copy, so
+    readers never see it missing. Docs written during the copy fail that check and leave the
+    old index in place, so run it while nothing writes to the index.
+
+    A data stream gets the lean template and rolls over. New backing indices are lean; older
+    ones keep their mappings until the lifecycle policy deletes them.
+    """
+    profile = current_profile(client, index_name)
+    result: Dict[str, Any] = {"index": index_name, "target": None, "reindexed": 0, "seconds": 0.0}
+    if profile is None:
+        raise RuntimeError(f"'{index_name}' does not exist. Create it with `setup_data.py --mapping-profile lean`.")
+    if profile == "lean":
+        print(f"'{index_name}' already uses the lean mapping profile.")
+        return result
+    mappings = profile_mappings(index_name, config["mappings"], "lean")
+    settings = profile_settings("lean")
+    started = time.perf_counter()
+
+    if _is_data_stream(client, index_name):
+        put_data_stream_template(client, index_name, mappings, settings, args)
+        result["target"] = client.indices.rollover(alias=index_name)["new_index"]
+        result["seconds"] = time.perf_counter() - started
+        print(f"Rolled '{index_name}' over to lean backing index '{result['target']}'.")
+        return result
+
+    # The concrete index behind `index_name`, which is an alias after an earlier switch.
+    source = next(iter(client.indices.get(index=index_name)))
+    source_settings = client.indices.get_settings(index=source, flat_settings=True)[source]["settings"]
+    layout = {
+        key: source_settings[key]
+        for key in ("index.number_of_shards", "index.number_of_replicas")
+        if key in source_settings
+    }
+    target = f"{index_name}-lean-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    print(f"Reindexing '{source}' into '{target}'...")
+    client.indices.create(index=target, mappings=mappings, settings={**layout, **settings})
+    with bulk_load_settings(client, target):
+        task_id = client.reindex(
+            source={"index": source}, dest={"index": target}, slices="auto", wait_for_completion=False
+        )["task"]
+        response = wait_for_task(client, task_id)
+    expected = client.count(index=source)["count"]
+    copied = client.count(index=target)["count"]
+    if response.get("failures") or copied != expected:
+        raise RuntimeError(
+            f"Reindex copied {copied} of {expected} docs ({len(response.get('failures', []))} failures). "
+            f"'{index_name}' is unchanged; delete '{target}' and retry."
+        )
+    client.indices.update_aliases(
+        actions=[{"add": {"index": target, "alias": index_name}}, {"remove_index": {"index": source}}]
+    )
+    result.update(target=target, reindexed=copied, seconds=time.perf_counter() - started)
+    print(f"  '{index_name}' now points at '{target}' ({copied:,} docs, {result['seconds']:.1f}s); deleted '{source}'.")
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create Signal2Bug indices and load seed data.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Only send docs that are new or changed since the last run (manifest: {SEED_MANIFEST_PATH}).",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Load all indices concurrently with parallel_bulk, with refresh and replicas off until each load ends.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500, help="Documents per bulk request.")
+    parser.add_argument("--threads", type=int, default=4, help="parallel_bulk threads per index in --fast mode.")
+    parser.add_argument(
+        "--logs-data-stream",
+        action="store_true",
+        help="Create logs as a data stream with an index template, index sorting and a lifecycle policy.",
+    )
+    parser.add_argument("--logs-rollover-max-age", default="1d", help="Roll the logs data stream over at this age.")
+    parser.add_argument(
+        "--logs-rollover-max-size",
+        default="50gb",
+        help="Roll the logs data stream over when a primary shard reaches this size.",
+    )
+    parser.add_argument("--logs-retention", default="30d", help="Delete logs backing indices after this long.")
+    parser.add_argument(
+        "--skip-rollup",
+        action="store_true",
+        help="Do not compute the 1/5/15-minute logs_rollup index while loading logs.",
+    )
+    parser.add_argument(
+        "--mapping-profile",
+        choices=MAPPING_PROFILES,
+        default="standard",
+        help="Mappings for indices this run creates. 'lean' maps filter- and display-only fields without norms, "
+        "positions, doc_values or indexing, and uses best_compression. Existing indices keep their profile.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command", help="Run instead of loading seed data.")
+    audit = commands.add_parser(
+        "audit",
+        help="Report index stats and the heaviest fields by _disk_usage (reads every shard; slow on big indices).",
+    )
+    audit.add_argument("indices", nargs="*", help="Indices to audit (default: every existing Signal2Bug index).")
+    audit.add_argument("--top", type=int, default=10, help="Fields to list per index.")
+    lean = commands.add_parser("lean-reindex", help="Switch existing indices to the lean mapping profile.")
+    lean.add_argument("indices", nargs="*", default=["logs"], help="Indices to switch (default: logs).")
+
+    args = parser.parse_args(argv)
+    unknown = [name for name in getattr(args, "indices", []) if name not in INDEX_CONFIGS]
+    if unknown:
+        parser.error(f"unknown index {', '.join(unknown)} (choose from {', '.join(INDEX_CONFIGS)})")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    args = parse_args(argv)
+    client = make_client()
+    print("Connected to Elasticsearch")
+
+    if args.command == "audit":
+        names = args.indices or [name for name in INDEX_CONFIGS if client.indices.exists(index=name)]
+        reports = [audit_index(client, name, args.top) for name in names]
+        print_audit(reports)
+        return reports
+    if args.command == "lean-reindex":
+        return [lean_reindex(client, name, INDEX_CONFIGS[name], args) for name in args.indices]
+
+    manifest = load_manifest(SEED_MANIFEST_PATH) if args.incremental else {}
+
+    source_configs = {name: config for name, config in INDEX_CONFIGS.items() if "rollup_of" not in config}
+    rollup_configs = {name: config for name, config in INDEX_CONFIGS.items() if "rollup_of" in config}
+    rollups = {config["rollup_of"]: LogRollup() for config in rollup_configs.values()} if not args.skip_rollup else {}
+
+    def load_source(index_name: str) -> Dict[str, Any]:
+        rollup = rollups.get(index_name)
+        tap = rollup.observe if rollup is not None else None
+        return load_index(client, index_name, source_configs[index_name], args, manifest, tap=tap)
+
+    if args.fast:
+        with ThreadPoolExecutor(max_workers=len(source_configs)) as pool:
+            results = list(pool.map(load_source, source_configs))
+    else:
+        results = [load_source(index_name) for index_name in source_configs]
+
+    for index_name, config in rollup_configs.items():
+        rollup = rollups.get(config["rollup_of"])
+        if rollup is None:
+            continue
+        print(f"Rolled up {rollup.observed} '{config['rollup_of']}' events into {len(rollup)} buckets.")
+        results.append(load_index(client, index_name, config, args, manifest, source=rollup.docs()))
+
+    for index_name in (result["index"] for result in results):
         count = client.count(index=index_name)["count"]
         print(f"  Total docs now in '{index_name}': {count}")
+    print_summary(results)
+
+    if args.incremental:
+        save_manifest(SEED_MANIFEST_PATH, manifest)
 
     print("\nDone.")
     print("You can now create Agent Builder tools for:")
@@ -341,6 +1077,9 @@ def main() -> None:
     print("- releases")
     print("- runbooks")
     print("- bug_intake_records (written by MCP when safe)")
+    print("- signal_links (signals linked to existing incidents, written by MCP)")
+    print("- logs_rollup (1/5/15-minute error-rate and latency buckets for ES|QL checks)")
+    return results
 
 
 if __name__ == "__main__":
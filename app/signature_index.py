@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+INACTIVE_STATUSES = {"resolved", "closed"}
+
+SIGNATURE_FIELDS = [
+    "incident_id",
+    "title",
+    "status",
+    "lifecycle_stage",
+    "severity",
+    "priority",
+    "service",
+    "endpoint",
+    "error_signature",
+    "stack_hash",
+    "error_codes",
+    "release_version",
+    "owner_team",
+    "duplicate_of",
+    "updated_at",
+]
+# What a lookup returns per match: the signature fields plus the incident's one-paragraph summary.
+LOOKUP_FIELDS = SIGNATURE_FIELDS + ["summary"]
+
+Key = Tuple[str, ...]
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+class SignatureIndex:
+    """
+    In-memory lookup of incidents by error signature, stack hash, error code and (service, endpoint).
+
+    Each incident is stored once; the key maps only hold incident IDs, so an upsert
+    replaces every key an incident was previously filed under. Upserts may run on another
+    thread while the event loop looks incidents up; a lookup racing one may miss that incident.
+    """
+
+    def __init__(self) -> None:
+        self._incidents: Dict[str, Dict[str, Any]] = {}
+        self._keys_by_incident: Dict[str, List[Key]] = {}
+        self._by_key: Dict[Key, Set[str]] = defaultdict(set)
+        self.watermark: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._incidents)
+
+    @staticmethod
+    def _keys(doc: Dict[str, Any]) -> List[Key]:
+        keys: List[Key] = []
+        if doc.get("error_signature"):
+            keys.append(("error_signature", doc["error_signature"]))
+        for stack_hash in _as_list(doc.get("stack_hash")):
+            keys.append(("stack_hash", stack_hash))
+        for code in _as_list(doc.get("error_codes")):
+            keys.append(("error_code", code))
+        if doc.get("service") and doc.get("endpoint"):
+            keys.append(("service_endpoint", doc["service"], doc["endpoint"]))
+        return keys
+
+    def upsert(self, doc: Dict[str, Any]) -> bool:
+        """Add or replace an incident; returns False when it is unchanged."""
+        incident_id = doc.get("incident_id")
+        if not incident_id:
+            return False
+        if self._incidents.get(incident_id) == doc:
+            return False
+        for key in self._keys_by_incident.pop(incident_id, []):
+            self._by_key[key].discard(incident_id)
+            if not self._by_key[key]:
+                del self._by_key[key]
+
+        keys = self._keys(doc)
+        self._incidents[incident_id] = doc
+        self._keys_by_incident[incident_id] = keys
+        for key in keys:
+            self._by_key[key].add(incident_id)
+
+        updated_at = doc.get("updated_at")
+        if updated_at and (self.watermark is None or _parse_ts(updated_at) > _parse_ts(self.watermark)):
+            self.watermark = updated_at
+        return True
+
+    def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for doc in docs if self.upsert(doc))
+
+    def get(self, incident_id: str) -> Optional[Dict[str, Any]]:
+        return self._incidents.get(incident_id)
+
+    def lookup(
+        self,
+        error_signature: Optional[str] = None,
+        stack_hash: Optional[str] = None,
+        error_codes: Optional[List[str]] = None,
+        service: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        include_resolved: bool = False,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Return incidents matching any given key, most specific matches first."""
+        probes: List[Tuple[str, Key]] = []
+        if error_signature:
+            probes.append(("error_signature", ("error_signature", error_signature)))
+        if stack_hash:
+            probes.append(("stack_hash", ("stack_hash", stack_hash)))
+        for code in error_codes or []:
+            probes.append((f"error_code:{code}", ("error_code", code)))
+        if service and endpoint:
+            probes.append(("service_endpoint", ("service_endpoint", service, endpoint)))
+
+        matched_on: Dict[str, List[str]] = defaultdict(list)
+        for label, key in probes:
+            # tuple() copies the set in one step, so a concurrent upsert cannot resize it mid-iteration.
+            for incident_id in tuple(self._by_key.get(key, ())):
+                matched_on[incident_id].append(label)
+
+        matches = []
+        for incident_id, labels in matched_on.items():
+            doc = self._incidents[incident_id]
+            if not include_resolved and str(doc.get("status", "")).lower() in INACTIVE_STATUSES:
+                continue
+            matches.append({**{field: doc.get(field) for field in LOOKUP_FIELDS}, "matched_on": labels})
+
+        # Signature and stack hash are near-exact evidence; error codes and endpoints are weaker.
+        def rank(match: Dict[str, Any]) -> Tuple[int, int]:
+            labels = match["matched_on"]
+            exact = sum(1 for label in labels if label in ("error_signature", "stack_hash"))
+            return (-exact, -len(labels))
+
+        matches.sort(key=lambda match: match.get("updated_at") or "", reverse=True)
+        matches.sort(key=rank)
+        return matches[:limit]
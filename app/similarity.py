@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SIMILARITY_TEXT_FIELDS = ["title", "summary", "user_report_text", "symptoms", "error_message_sample"]
+SIMILARITY_FIELDS = SIMILARITY_TEXT_FIELDS + [
+    "incident_id",
+    "status",
+    "severity",
+    "service",
+    "endpoint",
+    "error_signature",
+    "updated_at",
+]
+INACTIVE_STATUSES = {"resolved", "closed"}
+
+# Titles are short and written by triagers, so their terms count double.
+FIELD_WEIGHTS = {"title": 2.0}
+HASH_BITS = 20
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value if v is not None)
+    return str(value)
+
+
+def hashed_terms(fields: Iterable[Tuple[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash word unigrams and bigrams into 2**HASH_BITS buckets.
+
+    Returns unique bucket ids and their sublinear term frequencies (1 + log tf).
+    crc32 is used instead of hash() so buckets are stable across processes.
+    """
+    counts: Dict[int, float] = {}
+    mask = (1 << HASH_BITS) - 1
+    for text, weight in fields:
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode("utf-8")) & mask
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+    if not counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    buckets = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return buckets, (1.0 + np.log(tf)).astype(np.float32)
+
+
+def doc_terms(doc: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    fields = SIMILARITY_TEXT_FIELDS
+    return hashed_terms((_field_text(doc.get(field)), FIELD_WEIGHTS.get(field, 1.0)) for field in fields)
+
+
+class _Matrix:
+    """Immutable inverted TF-IDF matrix: postings sorted by bucket, with an indptr over all buckets."""
+
+    def __init__(
+        self, row_buckets: List[np.ndarray], row_tf: List[np.ndarray], idf: Optional[np.ndarray] = None
+    ) -> None:
+        n_rows = len(row_buckets)
+        lengths = np.fromiter((len(b) for b in row_buckets), dtype=np.int64, count=n_rows)
+        buckets = np.concatenate(row_buckets) if n_rows else np.empty(0, dtype=np.int32)
+        tf = np.concatenate(row_tf) if n_rows else np.empty(0, dtype=np.float32)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int32), lengths)
+
+        if idf is None:
+            df = np.bincount(buckets, minlength=1 << HASH_BITS)
+            idf = (np.log((1.0 + n_rows) / (1.0 + df)) + 1.0).astype(np.float32)
+        self.idf = idf
+
+        weights = tf * self.idf[buckets]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_rows))
+        weights = weights / np.maximum(norms, 1e-12)[rows]
+
+        order = np.argsort(buckets, kind="stable")
+        self.post_rows = rows[order]
+        self.post_weights = weights[order].astype(np.float32)
+        self.indptr = np.searchsorted(buckets[order], np.arange((1 << HASH_BITS) + 1))
+        self.n_rows = n_rows
+
+    def scores(self, q_buckets: np.ndarray, q_tf: np.ndarray) -> np.ndarray:
+        if not len(q_buckets) or not self.n_rows:
+            return np.zeros(self.n_rows, dtype=np.float64)
+        q_weights = q_tf * self.idf[q_buckets]
+        q_weights /= max(float(np.sqrt(np.dot(q_weights, q_weights))), 1e-12)
+
+        starts = self.indptr[q_buckets]
+        counts = self.indptr[q_buckets + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(self.n_rows, dtype=np.float64)
+        # Flatten every [start, start + count) posting range into one gather index.
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        contributions = self.post_weights[offsets] * np.repeat(q_weights, counts)
+        return np.bincount(self.post_rows[offsets], weights=contributions, minlength=self.n_rows)
+
+
+class _Snapshot:
+    """
+    What search() reads: a base matrix plus a delta matrix over rows added or changed since it was built.
+
+    Delta rows are weighted with the base IDF so their scores are comparable; their base rows, if
+    any, are masked out. Nothing here is mutated after construction.
+    """
+
+    def __init__(
+        self,
+        base: _Matrix,
+        delta: _Matrix,
+        delta_rows: np.ndarray,
+        docs: List[Dict[str, Any]],
+        active: List[bool],
+    ) -> None:
+        self.base, self.delta, self.delta_rows, self.docs = base, delta, delta_rows, docs
+        self.active_mask = np.array(active, dtype=bool)
+        self.services = np.array([doc.get("service") for doc in docs], dtype=object)
+        self.n_rows = len(docs)
+
+    def scores(self, q_buckets: np.ndarray, q_tf: np.ndarray) -> np.ndarray:
+        scores = np.zeros(self.n_rows, dtype=np.float64)
+        scores[: self.base.n_rows] = self.base.scores(q_buckets, q_tf)
+        if len(self.delta_rows):
+            scores[self.delta_rows] = self.delta.scores(q_buckets, q_tf)
+        return scores
+
+
+class SimilarityIndex:
+    """
+    Near-duplicate search over incident text with hashed TF-IDF and cosine similarity.
+
+    Per-incident hashed terms are cached, so an update only tokenizes the changed incidents.
+    publish() then builds a small delta matrix over them against the current IDF, and rebuilds
+    the full matrix (and IDF) only once the delta outgrows DELTA_REBUILD_FRACTION of it.
+
+    search() only reads the last published snapshot, so one thread may update() while the
+    event loop keeps searching; updates themselves must not run concurrently.
+    """
+
+    # Rebuild the base matrix once this share of its rows has been added or changed since.
+    DELTA_REBUILD_FRACTION = 0.1
+
+    def __init__(self) -> None:
+        self._row_by_id: Dict[str, int] = {}
+        self._docs: List[Dict[str, Any]] = []
+        self._row_buckets: List[np.ndarray] = []
+        self._row_tf: List[np.ndarray] = []
+        self._active: List[bool] = []
+        self._base = _Matrix([], [])
+        self._delta_rows: Set[int] = set()
+        self._snapshot = _Snapshot(self._base, self._base, np.zeros(0, dtype=np.int64), [], [])
+
+    def __len__(self) -> int:
+        return self._snapshot.n_rows
+
+    def upsert(self, doc: Dict[str, Any]) -> bool:
+        """Add or replace an incident; returns False when nothing relevant changed. Searchable after publish()."""
+        incident_id = doc.get("incident_id")
+        if not incident_id:
+            return False
+        projected = {field: doc.get(field) for field in SIMILARITY_FIELDS}
+        row = self._row_by_id.get(incident_id)
+        if row is not None and self._docs[row] == projected:
+            return False
+
+        buckets, tf = doc_terms(projected)
+        active = str(projected.get("status") or "").lower() not in INACTIVE_STATUSES
+        if row is None:
+            row = len(self._docs)
+            self._row_by_id[incident_id] = row
+            self._docs.append(projected)
+            self._row_buckets.append(buckets)
+            self._row_tf.append(tf)
+            self._active.append(active)
+        else:
+            self._docs[row] = projected
+            self._row_buckets[row] = buckets
+            self._row_tf[row] = tf
+            self._active[row] = active
+        self._delta_rows.add(row)
+        return True
+
+    def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for doc in docs if self.upsert(doc))
+
+    def publish(self, full: bool = False) -> None:
+        """Build matrices for the upserts so far and swap them in for search()."""
+        if full or len(self._delta_rows) > self.DELTA_REBUILD_FRACTION * self._base.n_rows:
+            self._base = _Matrix(list(self._row_buckets), list(self._row_tf))
+            self._delta_rows = set()
+        rows = sorted(self._delta_rows)
+        delta = _Matrix([self._row_buckets[row] for row in rows], [self._row_tf[row] for row in rows], self._base.idf)
+        self._snapshot = _Snapshot(
+            self._base, delta, np.array(rows, dtype=np.int64), list(self._docs), list(self._active)
+        )
+
+    def update(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """upsert_many() then publish() when anything changed; meant to run off the event loop."""
+        changed = self.upsert_many(docs)
+        if changed:
+            self.publish()
+        return changed
+
+    def search(
+        self,
+        text: str,
+        top_k: int = 5,
+        include_resolved: bool = False,
+        service: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        snapshot = self._snapshot
+        scores = snapshot.scores(*hashed_terms([(text, 1.0)]))
+        if not include_resolved:
+            scores = np.where(snapshot.active_mask, scores, 0.0)
+        if service:
+            scores = np.where(snapshot.services == service, scores, 0.0)
+
+        k = min(top_k, snapshot.n_rows)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {**snapshot.docs[row], "score": round(float(scores[row]), 4)}
+            for row in top
+            if scores[row] > min_score
+        ]
@@ -0,0 +1,264 @@
+"""
+Cold-start benchmark for the MCP server's HTTP serving mode.
+
+Loads generated seed data into the Elasticsearch stub, which runs in a child process, then
+starts app/mcp_server.py with MCP_WORKERS set to each --workers value, --runs times each.
+For every start it reports the seconds from process spawn until /healthz first answers,
+until /readyz first returns 200, until the first MCP tool call (find_similar_incidents,
+over the full initialize handshake) returns, and until every worker reports ready.
+
+While /readyz still returns 503, every poll also times /healthz: warm-up must not block the
+event loop, so a probe slower than --healthz-budget-ms fails the run and the exit status is 1:
+
+    python3 bench/bench_cold_start.py --workers 1 4 --runs 3 --latency-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from bench_suite import ROOT, git_revision, read_ndjson, run_ingest, stub_process
+from generate_data import generate
+
+POLL_INTERVAL_S = 0.01
+PROBE_TIMEOUT_S = 5.0
+MCP_HEADERS = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def http_get(url: str) -> Tuple[Optional[int], Dict[str, Any]]:
+    """Status and JSON body, or (None, {}) while nothing accepts connections yet."""
+    try:
+        with urllib.request.urlopen(url, timeout=PROBE_TIMEOUT_S) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, {}
+
+
+def mcp_post(url: str, message: Dict[str, Any], session_id: Optional[str]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Send one JSON-RPC message; return the session id and the first JSON-RPC reply, if any."""
+    headers = dict(MCP_HEADERS, **({"mcp-session-id": session_id} if session_id else {}))
+    request = urllib.request.Request(url, data=json.dumps(message).encode("utf-8"), headers=headers, method="POST")
+    with urllib.request.urlopen(request, timeout=60) as response:
+        session_id = response.headers.get("mcp-session-id") or session_id
+        body = response.read().decode("utf-8")
+    if response.headers.get_content_type() == "text/event-stream":
+        body = next((line[5:] for line in body.splitlines() if line.startswith("data:")), "")
+    return session_id, json.loads(body) if body.strip() else {}
+
+
+def call_tool(url: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    session_id, _ = mcp_post(
+        url,
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench_cold_start", "version": "1"},
+            },
+        },
+        None,
+    )
+    mcp_post(url, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session_id)
+    _, reply = mcp_post(
+        url,
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": name, "arguments": arguments}},
+        session_id,
+    )
+    if "error" in reply or reply.get("result", {}).get("isError"):
+        raise RuntimeError(f"{name} failed: {json.dumps(reply)[:500]}")
+    return reply
+
+
+def cold_start(
+    env: Dict[str, str], workers: int, query: str, log_path: Path, timeout: float, healthz_budget_ms: float
+) -> Dict[str, Any]:
+    """Start the server once and time each milestone from spawn; the server is stopped afterwards."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    marks: Dict[str, Optional[float]] = {"healthz_s": None, "ready_s": None, "first_request_s": None}
+    ready_pids: Set[int] = set()
+    warming_healthz_ms: List[float] = []
+
+    started = time.perf_counter()
+    with log_path.open("ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / "app" / "mcp_server.py")],
+            env={**env, "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port), "MCP_WORKERS": str(workers)},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    def elapsed() -> float:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}; see {log_path}")
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError(f"Server not serving after {timeout}s; see {log_path}")
+        return time.perf_counter() - started
+
+    try:
+        while http_get(f"{base}/healthz")[0] != 200:
+            elapsed()
+            time.sleep(POLL_INTERVAL_S)
+        marks["healthz_s"] = elapsed()
+        while True:
+            status, body = http_get(f"{base}/readyz")
+            if status == 200:
+                ready_pids.add(body["pid"])
+                break
+            if status == 503:
+                # A probe that fails or times out counts as taking the whole probe timeout.
+                probe_started = time.perf_counter()
+                healthy = http_get(f"{base}/healthz")[0] == 200
+                probe_s = time.perf_counter() - probe_started if healthy else PROBE_TIMEOUT_S
+                warming_healthz_ms.append(probe_s * 1000)
+            elapsed()
+            time.sleep(POLL_INTERVAL_S)
+        marks["ready_s"] = elapsed()
+
+        call_started = time.perf_counter()
+        call_tool(f"{base}/mcp", "find_similar_incidents", {"source_signal_text": query})
+        marks["first_request_s"] = elapsed()
+        first_request_ms = (time.perf_counter() - call_started) * 1000
+
+        # Connections land on whichever worker accepts first, so keep asking until each one has answered ready.
+        all_ready_s = None
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            status, body = http_get(f"{base}/readyz")
+            if status == 200:
+                ready_pids.add(body["pid"])
+            if len(ready_pids) >= workers:
+                all_ready_s = elapsed()
+                break
+            time.sleep(POLL_INTERVAL_S)
+    finally:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+    return {
+        **{name: round(value, 3) for name, value in marks.items() if value is not None},
+        "first_request_ms": round(first_request_ms, 1),
+        "all_workers_ready_s": round(all_ready_s, 3) if all_ready_s is not None else None,
+        "workers_seen_ready": len(ready_pids),
+        "warming_healthz_probes": len(warming_healthz_ms),
+        "warming_healthz_max_ms": round(max(warming_healthz_ms), 1) if warming_healthz_ms else None,
+        "healthz_within_budget": all(ms <= healthz_budget_ms for ms in warming_healthz_ms),
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"runs": len(runs)}
+    for key in (
+        "healthz_s",
+        "ready_s",
+        "first_request_s",
+        "first_request_ms",
+        "all_workers_ready_s",
+        "warming_healthz_max_ms",
+    ):
+        values = [run[key] for run in runs if run.get(key) is not None]
+        if values:
+            summary[f"{key}_p50"] = round(float(np.percentile(values, 50)), 3)
+            summary[f"{key}_max"] = round(max(values), 3)
+    summary["healthz_within_budget"] = all(run["healthz_within_budget"] for run in runs)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="MCP_WORKERS values to start with.")
+    parser.add_argument("--runs", type=int, default=3, help="Starts per worker count.")
+    parser.add_argument("--logs", type=int, default=20_000)
+    parser.add_argument("--bugs", type=int, default=10_000)
+    parser.add_argument("--releases", type=int, default=500)
+    parser.add_argument("--days", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every stub request.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Give up on a start after this many seconds.")
+    parser.add_argument(
+        "--healthz-budget-ms", type=float, default=1000.0, help="Slowest /healthz allowed while still warming up."
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with contextlib.ExitStack() as stack:
+        data_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="signal2bug-cold-start-")))
+        stub_url = stack.enter_context(stub_process(args.latency_ms))
+        env = {
+            **os.environ,
+            "ELASTIC_URL": stub_url,
+            "ELASTIC_API_KEY": "stub",
+            "SEED_DATA_DIR": str(data_dir),
+            "SEED_MANIFEST_PATH": str(data_dir / ".seed_manifest.json"),
+            "INTAKE_WAL_PATH": str(data_dir / ".intake_wal.ndjson"),
+        }
+        os.environ.update(env)
+        generate(data_dir, logs=args.logs, bugs=args.bugs, releases=args.releases, days=args.days, seed=args.seed)
+        ingest = run_ingest(argparse.Namespace(threads=4, chunk_size=1000, logs_data_stream=False))
+        query = read_ndjson(data_dir / "bugs_expanded.ndjson", 1)[0]["user_report_text"]
+
+        for workers in args.workers:
+            log_path = data_dir / f"server-{workers}.log"
+            runs = [
+                cold_start(env, workers, query, log_path, args.timeout, args.healthz_budget_ms)
+                for _ in range(args.runs)
+            ]
+            results[str(workers)] = {**summarize(runs), "each": runs}
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "params": {
+            "bugs": args.bugs,
+            "releases": args.releases,
+            "stub_latency_ms": args.latency_ms,
+            "runs": args.runs,
+            "healthz_budget_ms": args.healthz_budget_ms,
+        },
+        "ingest_docs": ingest["docs"],
+        "workers": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    if not all(result["healthz_within_budget"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Concurrency benchmark for the MCP intake tools against a local stub Elasticsearch.
+
+Compares the previous blocking model (the sync tool's client.index, run from a pool
+of --concurrency threads) with the async tools sharing one AsyncElasticsearch
+connection pool, at the same concurrency and pool size. Every
+request carries its own signal text, so each one is a distinct intake record and a
+real write; the duplicate scenario repeats one record to time the dedup path instead.
+
+    python3 bench/bench_concurrency.py --requests 400 --concurrency 32 --latency-ms 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from elasticsearch import Elasticsearch
+
+from stub_es import StubElasticsearch
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+RECORD: Dict[str, Any] = {
+    "title": "Checkout returns HTTP 500 after clicking Pay",
+    "summary": "Payment submit fails with PAYMENT_SESSION_MISSING after release 2.4.1.",
+    "classification": "Regression",
+    "severity": "high",
+    "confidence": 90,
+    "service": "payments-api",
+    "endpoint": "/api/payments/submit",
+}
+
+
+def distinct_records(n: int) -> List[Dict[str, Any]]:
+    """RECORD with a unique source_signal_text each, so no two share an idempotency fingerprint."""
+    return [
+        {**RECORD, "source_signal_text": f"Pay button returns HTTP 500 for order {i}: PAYMENT_SESSION_MISSING"}
+        for i in range(n)
+    ]
+
+
+def bench_blocking(url: str, records: List[Dict[str, Any]], concurrency: int) -> float:
+    client = Elasticsearch(url, api_key="stub", connections_per_node=concurrency)
+
+    def one(record: Dict[str, Any]) -> None:
+        client.index(index="bug_intake_records", document=record, refresh="wait_for")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        list(pool.map(one, records))
+        elapsed = time.perf_counter() - started
+    client.close()
+    return elapsed
+
+
+async def bench_async(records: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    """Seconds taken and the count of each returned status."""
+    import mcp_server
+
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(record: Dict[str, Any]) -> str:
+        async with gate:
+            return (await mcp_server.create_bug_intake_record(**record))["status"]
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(one(record) for record in records))
+    elapsed = time.perf_counter() - started
+    return {"seconds": elapsed, "statuses": {status: statuses.count(status) for status in sorted(set(statuses))}}
+
+
+async def bench_async_scenarios(requests: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    import mcp_server
+
+    try:
+        return {
+            "distinct": await bench_async(distinct_records(requests), concurrency),
+            "duplicates": await bench_async([RECORD] * requests, concurrency),
+        }
+    finally:
+        await mcp_server.get_es().close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    with StubElasticsearch(latency_ms=args.latency_ms) as stub:
+        os.environ.update({"ELASTIC_URL": stub.url, "ELASTIC_API_KEY": "stub"})
+        os.environ.setdefault("ELASTIC_CONNECTIONS_PER_NODE", str(args.concurrency))
+        sys.path.insert(0, str(APP_DIR))
+
+        blocking = bench_blocking(stub.url, distinct_records(args.requests), args.concurrency)
+        scenarios = asyncio.run(bench_async_scenarios(args.requests, args.concurrency))
+
+    concurrent, duplicates = scenarios["distinct"], scenarios["duplicates"]
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "stub_latency_ms": args.latency_ms,
+        "blocking_rps": round(args.requests / blocking, 1),
+        "async_rps": round(args.requests / concurrent["seconds"], 1),
+        "async_statuses": concurrent["statuses"],
+        "speedup": round(blocking / concurrent["seconds"], 2),
+        "duplicate_rps": round(args.requests / duplicates["seconds"], 1),
+        "duplicate_statuses": duplicates["statuses"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
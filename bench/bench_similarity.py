@@ -0,0 +1,105 @@
+"""
+Latency benchmark for the find_similar_incidents engine on synthetic incidents.
+
+Builds the hashed TF-IDF index over --incidents synthetic bugs derived from
+data/bugs.json, applies one incremental batch, and reports query latency
+percentiles against --p99-target-ms.
+
+    python3 bench/bench_similarity.py --incidents 100000 --queries 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "app"))
+
+from similarity import SimilarityIndex  # noqa: E402
+
+SERVICES = ["payments-api", "checkout-ui", "auth-api", "notifications-worker", "search-api", "cart-api", "orders-api"]
+FILLER = (
+    "timeout retry cache session token queue latency spike stale null reference deadlock "
+    "rollback migration config flag canary region tenant mobile web android ios cart order "
+    "refund invoice email webhook throttle quota batch worker pool connection reset"
+).split()
+
+
+def synthetic_bugs(n: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    templates = json.loads((ROOT / "data" / "bugs.json").read_text(encoding="utf-8"))
+    bugs = []
+    for i in range(n):
+        base = templates[i % len(templates)]
+        noise = " ".join(rng.choices(FILLER, k=12))
+        bugs.append(
+            {
+                **base,
+                "incident_id": f"INC-S{i:07d}",
+                "status": rng.choice(["Open", "Open", "Resolved"]),
+                "service": rng.choice(SERVICES),
+                "title": f"{base['title']} {' '.join(rng.choices(FILLER, k=3))}",
+                "summary": f"{base['summary']} {noise}",
+            }
+        )
+    return bugs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--incremental", type=int, default=1000, help="Incidents added after the initial build.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--p99-target-ms", type=float, default=25.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    bugs = synthetic_bugs(args.incidents + args.incremental, args.seed)
+    index = SimilarityIndex()
+
+    started = time.perf_counter()
+    index.upsert_many(bugs[: args.incidents])
+    tokenized = time.perf_counter()
+    index.publish()
+    built = time.perf_counter()
+
+    index.update(bugs[args.incidents :])
+    incremental = time.perf_counter()
+
+    rng = random.Random(args.seed + 1)
+    queries = [
+        f"{rng.choice(bugs)['user_report_text']} {' '.join(rng.choices(FILLER, k=4))}" for _ in range(args.queries)
+    ]
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        index.search(query, top_k=args.top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    report = {
+        "incidents": len(index),
+        "queries": args.queries,
+        "tokenize_s": round(tokenized - started, 2),
+        "build_s": round(built - tokenized, 2),
+        "incremental_s": round(incremental - built, 2),
+        "query_p50_ms": round(float(p50), 2),
+        "query_p95_ms": round(float(p95), 2),
+        "query_p99_ms": round(float(p99), 2),
+        "p99_target_ms": args.p99_target_ms,
+        "p99_target_met": bool(p99 <= args.p99_target_ms),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
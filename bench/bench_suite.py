@@ -0,0 +1,324 @@
+"""
+End-to-end offline benchmark: synthetic data, seed load and every MCP tool.
+
+Generates correlated seed data with generate_data.py, loads it with app/setup_data.py
+and calls each MCP tool --calls times against the Elasticsearch stub, which runs in a
+child process so it does not share this process's memory or GIL. Prints one JSON report
+with ingest docs/s per index, tool latency p50/p95/p99 and peak RSS of the benchmark
+process. Save reports with --output and pass an older one as --baseline to see ratios
+against it:
+
+    python3 bench/bench_suite.py --logs 200000 --bugs 10000 --releases 500 --output before.json
+    python3 bench/bench_suite.py --logs 200000 --bugs 10000 --releases 500 --baseline before.json
+
+The response cache is off unless --cache is given, so repeated calls measure the full
+path rather than cache hits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "app"))
+
+from generate_data import generate  # noqa: E402
+from stub_es import StubElasticsearch  # noqa: E402
+
+ToolCall = Callable[[int], Awaitable[Any]]
+
+
+def _serve_stub(conn: Any, latency_ms: float) -> None:
+    with StubElasticsearch(latency_ms=latency_ms) as stub:
+        conn.send(stub.url)
+        conn.recv()
+
+
+@contextlib.contextmanager
+def stub_process(latency_ms: float) -> Any:
+    """Run the stub in a child process and yield its URL."""
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.get_context("spawn").Process(target=_serve_stub, args=(child, latency_ms), daemon=True)
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        parent.send("stop")
+        process.join(timeout=10)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(["git", "status", "--porcelain"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def read_ndjson(path: Path, limit: int) -> List[Dict[str, Any]]:
+    docs = []
+    compressed = path.with_name(path.name + ".gz")
+    opened = gzip.open(compressed, "rt", encoding="utf-8") if compressed.exists() else path.open("r", encoding="utf-8")
+    with opened as f:
+        for line in f:
+            docs.append(json.loads(line))
+            if len(docs) >= limit:
+                break
+    return docs
+
+
+def tool_calls(mcp_server: Any, data_dir: Path, seed: int) -> Dict[str, ToolCall]:
+    """One call factory per benchmarked tool; the argument is the call number."""
+    rng = random.Random(seed)
+    # Bad-release incidents come first in the generated bugs, so these are correlated with logs and releases.
+    incidents = read_ndjson(data_dir / "bugs_expanded.ndjson", 200)
+
+    def incident(i: int) -> Dict[str, Any]:
+        return incidents[i % len(incidents)]
+
+    def around(doc: Dict[str, Any], hours: float) -> Tuple[str, str]:
+        first_seen = np.datetime64(doc["first_seen"].rstrip("Z"), "ms")
+        delta = np.timedelta64(int(hours * 3_600_000), "ms")
+        return str(first_seen - delta) + "Z", str(first_seen + delta) + "Z"
+
+    def intake(i: int) -> Dict[str, Any]:
+        doc = incident(i)
+        return {
+            "title": f"{doc['title']} (bench {i})",
+            "summary": doc["summary"],
+            "classification": "Regression",
+            "severity": "high",
+            "confidence": 85,
+            "service": doc["service"],
+            "endpoint": doc["endpoint"],
+            "error_code": doc["error_codes"][-1],
+            "release_version": doc.get("release_version"),
+            "source_signal_text": f"{doc['user_report_text']} run {seed}-{i}-{rng.random()}",
+        }
+
+    def regression(source: str) -> ToolCall:
+        def call(i: int) -> Awaitable[Any]:
+            doc = incident(i)
+            since, until = around(doc, 3)
+            return mcp_server.detect_post_release_regression(
+                doc["service"], endpoint=doc["endpoint"], since=since, until=until, source=source
+            )
+
+        return call
+
+    return {
+        "lookup_incidents_by_signature": lambda i: mcp_server.lookup_incidents_by_signature(
+            error_signature=incident(i)["error_signature"]
+        ),
+        "find_similar_incidents": lambda i: mcp_server.find_similar_incidents(
+            f"{incident(i)['user_report_text']} {incident(i)['error_message_sample']}"
+        ),
+        "get_triage_context": lambda i: mcp_server.get_triage_context(
+            service=incident(i)["service"],
+            endpoint=incident(i)["endpoint"],
+            error_code=incident(i)["error_codes"][-1],
+            since=around(incident(i), 2)[0],
+            until=around(incident(i), 2)[1],
+        ),
+        "correlate_release": lambda i: mcp_server.correlate_release(
+            incident(i)["service"], [around(incident(i), h / 4)[1] for h in range(-8, 8)]
+        ),
+        "detect_post_release_regression": regression("logs"),
+        "detect_post_release_regression[rollup]": regression("rollup"),
+        "create_bug_intake_record": lambda i: mcp_server.create_bug_intake_record(**intake(i)),
+        "create_bug_intake_records_batch": lambda i: mcp_server.create_bug_intake_records_batch(
+            [intake(i * 1000 + j) for j in range(20)], refresh="none"
+        ),
+        "link_signal_to_existing_incident": lambda i: mcp_server.link_signal_to_existing_incident(
+            incident(i)["incident_id"], f"{incident(i)['user_report_text']} ({i})", error_code="HTTP_500"
+        ),
+        "get_incident_signal_stats": lambda i: mcp_server.get_incident_signal_stats(incident(i)["incident_id"]),
+        "get_intake_queue_status": lambda i: mcp_server.get_intake_queue_status(),
+        "get_response_cache_stats": lambda i: mcp_server.get_response_cache_stats(),
+    }
+
+
+async def bench_tools(data_dir: Path, calls: int, seed: int) -> Dict[str, Any]:
+    import mcp_server
+
+    started = time.perf_counter()
+    async with mcp_server._lifespan(mcp_server.mcp):
+        await mcp_server.wait_until_ready()
+        startup = time.perf_counter() - started
+        benchmarks = tool_calls(mcp_server, data_dir, seed)
+        registered = {tool.name for tool in await mcp_server.mcp.list_tools()}
+        covered = {name.split("[")[0] for name in benchmarks}
+
+        results: Dict[str, Any] = {}
+        for name, call in benchmarks.items():
+            latencies: List[float] = []
+            errors: List[str] = []
+            for i in range(calls):
+                t0 = time.perf_counter()
+                try:
+                    await call(i)
+                except Exception as exc:
+                    errors.append(f"{type(exc).__name__}: {exc}")
+                latencies.append((time.perf_counter() - t0) * 1000)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            results[name] = {
+                "calls": calls,
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(max(latencies), 3),
+                "errors": len(errors),
+                "first_error": errors[0] if errors else None,
+            }
+    return {"startup_s": round(startup, 3), "tools": results, "tools_not_benchmarked": sorted(registered - covered)}
+
+
+def run_ingest(args: argparse.Namespace) -> Dict[str, Any]:
+    import setup_data
+
+    argv = ["--fast", "--threads", str(args.threads), "--chunk-size", str(args.chunk_size)]
+    if args.logs_data_stream:
+        argv.append("--logs-data-stream")
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        results = setup_data.main(argv)
+    elapsed = time.perf_counter() - started
+
+    indices = {
+        r["index"]: {
+            "docs": r["indexed"],
+            "errors": r["errors"],
+            "seconds": round(r["seconds"], 3),
+            "docs_per_s": round(r["indexed"] / r["seconds"]) if r["seconds"] else None,
+        }
+        for r in results
+    }
+    total = sum(r["indexed"] for r in results)
+    return {"seconds": round(elapsed, 3), "docs": total, "docs_per_s": round(total / elapsed), "indices": indices}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Current / baseline ratios: above 1 is faster for docs/s and slower for latencies."""
+
+    def ratio(current: Optional[float], before: Optional[float]) -> Optional[float]:
+        return round(current / before, 3) if current and before else None
+
+    return {
+        "baseline_commit": baseline.get("revision", {}).get("commit"),
+        "ingest_docs_per_s": ratio(report["ingest"]["docs_per_s"], baseline["ingest"]["docs_per_s"]),
+        "tool_p95_ms": {
+            name: ratio(stats["p95_ms"], baseline["tools"].get(name, {}).get("p95_ms"))
+            for name, stats in report["tools"].items()
+        },
+        "peak_rss_mb": ratio(report["peak_rss_mb"]["tools"], baseline["peak_rss_mb"]["tools"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=200_000)
+    parser.add_argument("--bugs", type=int, default=10_000)
+    parser.add_argument("--releases", type=int, default=500)
+    parser.add_argument("--days", type=float, default=3.0, help="Time window the generated data covers.")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per tool.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every stub request.")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on.")
+    parser.add_argument("--logs-data-stream", action="store_true", help="Load logs as a data stream.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, help="Where to write generated data (default: a temporary dir).")
+    parser.add_argument("--reuse-data", action="store_true", help="Use the data already in --data-dir.")
+    parser.add_argument("--output", type=Path, help="Also write the report to this file.")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against.")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="signal2bug-bench-")))
+        stub_url = stack.enter_context(stub_process(args.latency_ms))
+        os.environ.update(
+            {
+                "ELASTIC_URL": stub_url,
+                "ELASTIC_API_KEY": "stub",
+                "SEED_DATA_DIR": str(data_dir),
+                "SEED_MANIFEST_PATH": str(data_dir / ".seed_manifest.json"),
+                "INTAKE_WAL_PATH": str(data_dir / ".intake_wal.ndjson"),
+                "RESPONSE_CACHE_TTL_SECONDS": os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "30") if args.cache else "0",
+            }
+        )
+
+        generated = None
+        if not args.reuse_data:
+            generated = generate(
+                data_dir,
+                logs=args.logs,
+                bugs=args.bugs,
+                releases=args.releases,
+                days=args.days,
+                seed=args.seed,
+            )
+        rss_generate = peak_rss_mb()
+        ingest = run_ingest(args)
+        rss_ingest = peak_rss_mb()
+        tools = asyncio.run(bench_tools(data_dir, args.calls, args.seed))
+
+    report: Dict[str, Any] = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "params": {
+            "logs": args.logs,
+            "bugs": args.bugs,
+            "releases": args.releases,
+            "days": args.days,
+            "calls": args.calls,
+            "stub_latency_ms": args.latency_ms,
+            "threads": args.threads,
+            "chunk_size": args.chunk_size,
+            "response_cache": args.cache,
+            "logs_data_stream": args.logs_data_stream,
+            "seed": args.seed,
+        },
+        "generate": {name: info["docs_per_s"] for name, info in generated["files"].items()} if generated else None,
+        "ingest": ingest,
+        **tools,
+        "peak_rss_mb": {"generate": rss_generate, "ingest": rss_ingest, "tools": peak_rss_mb()},
+    }
+    if args.baseline:
+        report["vs_baseline"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
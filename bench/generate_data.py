@@ -0,0 +1,504 @@
+"""
+Synthetic seed data generator for Signal2Bug.
+
+Scales the samples in data/*.json up to bugs, releases and logs of any size and writes
+them as streaming NDJSON seed files (bugs_expanded.ndjson, ...) that
+app/setup_data.py picks up ahead of the small samples:
+
+    python3 bench/generate_data.py --logs 10000000 --bugs 100000 --releases 5000 --gzip
+    python3 app/setup_data.py --fast
+
+The data is correlated the way triage expects it to be. A fraction of releases
+(--bad-release-ratio) break one endpoint of a service they change. After such a deploy,
+that endpoint's logs show a higher error rate with one error code and slower latency
+until the incident is mitigated. Each bad release gets an incident in bugs with the
+matching error_signature, release_version and deployment_id, and some later incidents
+are filed as duplicates of it. Everything else is background noise. Logs are generated
+in @timestamp order and written as they are produced, so memory does not grow with --logs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import itertools
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED_DIR = ROOT / "data"
+# Seed files app/setup_data.py reads as-is; copied when writing somewhere other than data/.
+PASSTHROUGH_SEEDS = ["runbooks.json", "bug_intake_records.json"]
+
+GENERIC_ERROR_CODES = ["UPSTREAM_TIMEOUT", "DB_POOL_EXHAUSTED", "CACHE_STAMPEDE", "DEPENDENCY_UNAVAILABLE"]
+BAD_STATUS_CODES = [500, 500, 502, 503, 504, 429]
+REGIONS = ["us-central1", "us-east1", "europe-west1"]
+TIERS = ["standard", "standard", "standard", "premium", "enterprise"]
+
+
+@dataclass
+class Service:
+    name: str
+    team: str
+    endpoints: List[str]
+    components: List[str]
+    error_codes: List[str]
+    latency_ms: List[float] = field(default_factory=list)
+
+
+@dataclass
+class PlannedRelease:
+    seq: int
+    version: str
+    deployment_id: str
+    build_number: str
+    environment: str
+    started_ms: int
+    finished_ms: int
+    services: List[str]
+    endpoints: List[str]
+    # Set on bad releases: (service, endpoint, error_code, status_code, incident end in epoch ms).
+    breaks: Optional[Tuple[str, str, str, int, int]] = None
+
+
+def _load_seed(name: str) -> List[Dict[str, Any]]:
+    with (SEED_DIR / name).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _iso(epoch_ms: int) -> str:
+    return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def build_catalog(n_services: int, bugs: List[Dict[str, Any]], logs: List[Dict[str, Any]]) -> List[Service]:
+    """
+    Services modelled on the sample data. The sample services come first; beyond those,
+    numbered copies (payments-api-2, ...) keep their endpoints and error codes.
+    """
+    base: Dict[str, Service] = {}
+    for doc in bugs + logs:
+        name = doc["service"]
+        service = base.setdefault(
+            name, Service(name, doc.get("owner_team") or name.split("-")[0], [], [], [], [100.0, 180.0])
+        )
+        if doc.get("endpoint") and doc["endpoint"] not in service.endpoints:
+            service.endpoints.append(doc["endpoint"])
+        if doc.get("component") and doc["component"] not in service.components:
+            service.components.append(doc["component"])
+        for code in doc.get("error_codes") or [doc.get("error_code")]:
+            if code and code != "NONE" and not code.startswith("HTTP_") and code not in service.error_codes:
+                service.error_codes.append(code)
+    for doc in logs:
+        if not doc.get("anomaly_flag") and doc.get("latency_ms"):
+            base[doc["service"]].latency_ms.append(float(doc["latency_ms"]))
+
+    templates = list(base.values())
+    catalog = []
+    for i in range(n_services):
+        template = templates[i % len(templates)]
+        copy = i // len(templates)
+        name = template.name if copy == 0 else f"{template.name}-{copy + 1}"
+        suffix = "" if copy == 0 else f"/v{copy + 1}"
+        catalog.append(
+            Service(
+                name=name,
+                team=template.team,
+                endpoints=[endpoint + suffix for endpoint in template.endpoints] + [f"/internal/{name}/health"],
+                components=template.components or [name],
+                error_codes=template.error_codes + GENERIC_ERROR_CODES,
+                latency_ms=template.latency_ms,
+            )
+        )
+    return catalog
+
+
+def plan_releases(
+    rng: random.Random,
+    catalog: List[Service],
+    count: int,
+    start_ms: int,
+    end_ms: int,
+    bad_ratio: float,
+) -> List[PlannedRelease]:
+    step = (end_ms - start_ms) / max(count, 1)
+    releases = []
+    for seq in range(count):
+        started = int(start_ms + seq * step + rng.random() * step * 0.5)
+        environment = "prod" if rng.random() < 0.8 else "staging"
+        services = rng.sample(catalog, k=1 if rng.random() < 0.7 else min(2, len(catalog)))
+        endpoints = [endpoint for service in services for endpoint in service.endpoints[:2]]
+        version = f"{3 + seq // 2000}.{(seq // 50) % 40}.{seq % 50}"
+        breaks = None
+        if rng.random() < bad_ratio:
+            broken = services[0]
+            breaks = (
+                broken.name,
+                broken.endpoints[0],
+                rng.choice(broken.error_codes),
+                rng.choice(BAD_STATUS_CODES),
+                started + rng.randint(30, 240) * 60_000,
+            )
+        releases.append(
+            PlannedRelease(
+                seq=seq,
+                version=version,
+                deployment_id=f"dep-{version}-{environment}-{seq:05d}",
+                build_number=datetime.fromtimestamp(started / 1000, tz=timezone.utc).strftime("%Y.%m.%d.") + str(seq),
+                environment=environment,
+                started_ms=started,
+                finished_ms=started + rng.randint(3, 20) * 60_000,
+                services=[service.name for service in services],
+                endpoints=endpoints,
+                breaks=breaks,
+            )
+        )
+    return releases
+
+
+def iter_release_docs(
+    rng: random.Random, plan: List[PlannedRelease], templates: List[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    for release in plan:
+        template = templates[release.seq % len(templates)]
+        strategy = rng.choice(["full", "full", "canary", "rolling"])
+        notes = f"Changes to {', '.join(release.services)} ({', '.join(release.endpoints)})."
+        if release.breaks:
+            notes += f" Touches {release.breaks[1]} request handling."
+        yield {
+            **template,
+            "release_version": release.version,
+            "release_name": f"{template['release_name']} #{release.seq}",
+            "build_number": release.build_number,
+            "deployment_id": release.deployment_id,
+            "deployment_started_at": _iso(release.started_ms),
+            "deployment_finished_at": _iso(release.finished_ms),
+            "deployed_at": _iso(release.finished_ms),
+            "environment": release.environment,
+            "release_channel": release.environment,
+            "rollout_strategy": strategy,
+            "rollout_percentage": 100.0 if strategy != "canary" else rng.choice([5.0, 25.0, 50.0, 100.0]),
+            "canary_group": "canary-a" if strategy == "canary" else None,
+            "services_changed": release.services,
+            "endpoints_changed": release.endpoints,
+            "release_notes": f"{template['release_notes']} {notes}",
+            "risk_level": rng.choice(["low", "medium", "medium", "high"]),
+        }
+
+
+class ReleaseTimeline:
+    """Which planned release of a service was live at a point in time, per environment."""
+
+    def __init__(self, plan: List[PlannedRelease]) -> None:
+        self._starts: Dict[Tuple[str, str], List[int]] = {}
+        self._releases: Dict[Tuple[str, str], List[PlannedRelease]] = {}
+        for release in plan:
+            for service in release.services:
+                key = (service, release.environment)
+                self._starts.setdefault(key, []).append(release.started_ms)
+                self._releases.setdefault(key, []).append(release)
+
+    def live(self, service: str, environment: str, epoch_ms: int) -> Optional[PlannedRelease]:
+        starts = self._starts.get((service, environment))
+        if not starts:
+            return None
+        i = bisect.bisect_right(starts, epoch_ms) - 1
+        return self._releases[(service, environment)][i] if i >= 0 else None
+
+
+def _stable_choice(values: List[str], key: str) -> str:
+    return values[zlib.crc32(key.encode("utf-8")) % len(values)]
+
+
+def _bug_fields(
+    template: Dict[str, Any],
+    service: Service,
+    endpoint: str,
+    code: str,
+    status_code: int,
+    release: Optional[PlannedRelease],
+) -> Dict[str, Any]:
+    return {
+        **template,
+        "service": service.name,
+        "owner_service": service.name,
+        "owner_team": service.team,
+        "component": _stable_choice(service.components, endpoint),
+        "endpoint": endpoint,
+        "error_codes": [f"HTTP_{status_code}", code],
+        "error_signature": f"{service.name}:{endpoint}:HTTP_{status_code}:{code}",
+        "stack_hash": f"stk-{zlib.crc32(f'{service.name}:{endpoint}:{code}'.encode('utf-8')) % 100_000:05d}",
+        "release_version": release.version if release else None,
+        "deployment_id": release.deployment_id if release else None,
+        "build_number": release.build_number if release else None,
+        "environment": release.environment if release else "prod",
+    }
+
+
+def iter_bug_docs(
+    rng: random.Random,
+    plan: List[PlannedRelease],
+    catalog: List[Service],
+    count: int,
+    start_ms: int,
+    end_ms: int,
+    templates: List[Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    """
+    One incident per bad release first, then background incidents, a quarter of which are
+    duplicates of an earlier incident for the same breakage.
+    """
+    by_name = {service.name: service for service in catalog}
+    by_service = {}
+    for template in templates:
+        by_service.setdefault(template["service"], template)
+    timeline = ReleaseTimeline(plan)
+    bad = [release for release in plan if release.breaks]
+    now_ms = end_ms
+
+    for seq in range(count):
+        incident_id = f"INC-G{seq:07d}"
+        duplicate_of = None
+        if seq < len(bad):
+            release = bad[seq]
+            service_name, endpoint, code, status_code, until_ms = release.breaks
+            service = by_name[service_name]
+            first_seen = release.started_ms + rng.randint(2, 20) * 60_000
+            last_seen = until_ms
+            introduced = True
+        elif bad and rng.random() < 0.25:
+            original = rng.randrange(len(bad))
+            release = bad[original]
+            service_name, endpoint, code, status_code, until_ms = release.breaks
+            service = by_name[service_name]
+            first_seen = rng.randint(release.started_ms, until_ms)
+            last_seen = until_ms
+            duplicate_of = f"INC-G{original:07d}"
+            introduced = True
+        else:
+            service = rng.choice(catalog)
+            endpoint = rng.choice(service.endpoints)
+            code = rng.choice(service.error_codes)
+            status_code = rng.choice(BAD_STATUS_CODES)
+            first_seen = rng.randint(start_ms, end_ms)
+            last_seen = first_seen + rng.randint(5, 600) * 60_000
+            release = timeline.live(service.name, "prod", first_seen)
+            introduced = False
+
+        template = by_service.get(service.name.rsplit("-", 1)[0]) or by_service.get(service.name)
+        template = template or templates[seq % len(templates)]
+        resolved = duplicate_of is not None or (last_seen < now_ms - 3 * 86_400_000 and rng.random() < 0.85)
+        doc = _bug_fields(template, service, endpoint, code, status_code, release)
+        doc.update(
+            {
+                "incident_id": incident_id,
+                "bug_id": f"BUG-G{seq:07d}",
+                "external_ticket_id": f"JIRA-{service.team.upper()}-{seq}",
+                "status": "Resolved" if resolved else "Open",
+                "lifecycle_stage": "closed" if resolved else "triaged",
+                "created_at": _iso(first_seen + 5 * 60_000),
+                "updated_at": _iso(last_seen),
+                "first_seen": _iso(first_seen),
+                "last_seen": _iso(last_seen),
+                "resolved_at": _iso(last_seen + 30 * 60_000) if resolved else None,
+                "title": f"{code.replace('_', ' ').lower()} on {endpoint} ({service.name})",
+                "summary": f"{template['summary']} Seen as HTTP {status_code} {code} on {endpoint}.",
+                "error_message_sample": code.replace("_", " ").lower(),
+                "duplicate_of": duplicate_of,
+                "introduced_after_change": introduced,
+                "triage_decision": "duplicate" if duplicate_of else template.get("triage_decision"),
+                "affected_user_count_estimate": rng.randint(1, 5000),
+            }
+        )
+        yield doc
+
+
+def iter_log_docs(
+    rng: random.Random,
+    plan: List[PlannedRelease],
+    catalog: List[Service],
+    count: int,
+    start_ms: int,
+    end_ms: int,
+) -> Iterator[Dict[str, Any]]:
+    """Raw request events in @timestamp order, with elevated errors while a bad release is live."""
+    timeline = ReleaseTimeline(plan)
+    step = (end_ms - start_ms) / max(count, 1)
+    # Zipf-like traffic: the first services are the busiest, but every service sees steady load.
+    traffic = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(catalog))))
+    last_second, second_prefix = -1, ""
+    for seq in range(count):
+        epoch_ms = int(start_ms + seq * step + rng.random() * step)
+        second = epoch_ms // 1000
+        if second != last_second:
+            last_second = second
+            second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        service = rng.choices(catalog, cum_weights=traffic)[0]
+        endpoint = rng.choice(service.endpoints)
+        environment = "prod" if rng.random() < 0.85 else "staging"
+        release = timeline.live(service.name, environment, epoch_ms)
+
+        error_rate, latency_factor, code, status_code = 0.01, 1.0, rng.choice(service.error_codes), 500
+        if release is not None and release.breaks is not None:
+            broken_service, broken_endpoint, broken_code, broken_status, until_ms = release.breaks
+            if broken_service == service.name and broken_endpoint == endpoint and epoch_ms < until_ms:
+                error_rate, latency_factor, code, status_code = 0.3, 4.0, broken_code, broken_status
+        is_error = rng.random() < error_rate
+        latency = int(rng.choice(service.latency_ms) * rng.lognormvariate(0, 0.5) * latency_factor)
+        if not is_error:
+            code, status_code = "NONE", 200
+        trace = f"{rng.getrandbits(64):016x}"
+        yield {
+            "event_id": f"evt-g{seq:010d}",
+            "@timestamp": f"{second_prefix}.{epoch_ms % 1000:03d}Z",
+            "trace_id": trace,
+            "span_id": trace[:8],
+            "request_id": f"req-{trace[8:]}",
+            "service": service.name,
+            "component": _stable_choice(service.components, endpoint),
+            "host": f"{service.name}-{environment}-{seq % 6}",
+            "region": REGIONS[seq % len(REGIONS)],
+            "environment": environment,
+            "endpoint": endpoint,
+            "http_method": "GET" if endpoint.startswith("/internal") else "POST",
+            "status_code": status_code,
+            "status_family": f"{status_code // 100}xx",
+            "latency_ms": latency,
+            "error_code": code,
+            "error_message": code.replace("_", " ").lower() if is_error else None,
+            "error_signature": f"{service.name}:{endpoint}:HTTP_{status_code}:{code}" if is_error else None,
+            "is_timeout": is_error and status_code == 504,
+            "release_version": release.version if release else None,
+            "build_number": release.build_number if release else None,
+            "deployment_id": release.deployment_id if release else None,
+            "customer_tier": rng.choice(TIERS),
+            "count": 1,
+            "is_aggregated_record": False,
+            "log_level": "ERROR" if is_error else "INFO",
+            "signal_type": "error" if is_error else "request",
+            "anomaly_flag": False,
+        }
+
+
+def _open_output(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=3)
+    return path.open("w", encoding="utf-8")
+
+
+def write_ndjson(path: Path, docs: Iterable[Dict[str, Any]]) -> int:
+    """Write docs one per line to a temporary file and move it into place when complete."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    written = 0
+    with _open_output(tmp_path) as f:
+        lines: List[str] = []
+        for doc in docs:
+            lines.append(json.dumps(doc, separators=(",", ":")))
+            if len(lines) >= 10_000:
+                f.write("\n".join(lines) + "\n")
+                written += len(lines)
+                lines = []
+        if lines:
+            f.write("\n".join(lines) + "\n")
+            written += len(lines)
+    tmp_path.replace(path)
+    return written
+
+
+def generate(
+    out_dir: Path,
+    logs: int,
+    bugs: int,
+    releases: int,
+    services: int = 24,
+    days: float = 30.0,
+    end: Optional[str] = None,
+    bad_release_ratio: float = 0.1,
+    seed: int = 42,
+    compress: bool = False,
+) -> Dict[str, Any]:
+    """Write bugs/releases/logs_expanded seed files into out_dir and return counts and timings."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    end_dt = datetime.fromisoformat(end.replace("Z", "+00:00")) if end else datetime.now(timezone.utc)
+    end_ms = int(end_dt.timestamp() * 1000)
+    start_ms = end_ms - int(days * 86_400_000)
+
+    seed_bugs, seed_logs = _load_seed("bugs.json"), _load_seed("logs.json")
+    catalog = build_catalog(services, seed_bugs, seed_logs)
+    plan = plan_releases(rng, catalog, releases, start_ms, end_ms, bad_release_ratio)
+
+    extension = ".ndjson.gz" if compress else ".ndjson"
+    outputs = {
+        "releases": lambda: iter_release_docs(rng, plan, _load_seed("releases.json")),
+        "bugs": lambda: iter_bug_docs(rng, plan, catalog, bugs, start_ms, end_ms, seed_bugs),
+        "logs": lambda: iter_log_docs(rng, plan, catalog, logs, start_ms, end_ms),
+    }
+    summary: Dict[str, Any] = {
+        "out_dir": str(out_dir),
+        "window": {"since": _iso(start_ms), "until": _iso(end_ms)},
+        "services": len(catalog),
+        "bad_releases": sum(1 for release in plan if release.breaks),
+        "files": {},
+    }
+    for name, make_docs in outputs.items():
+        path = out_dir / f"{name}_expanded{extension}"
+        # setup_data picks the first existing variant, so drop stale ones in other formats.
+        for stale in (".ndjson.gz", ".ndjson", ".json"):
+            stale_path = out_dir / f"{name}_expanded{stale}"
+            if stale_path != path and stale_path.exists():
+                stale_path.unlink()
+        started = time.perf_counter()
+        written = write_ndjson(path, make_docs())
+        elapsed = time.perf_counter() - started
+        summary["files"][name] = {
+            "path": str(path),
+            "docs": written,
+            "bytes": path.stat().st_size,
+            "seconds": round(elapsed, 2),
+            "docs_per_s": round(written / max(elapsed, 1e-9)),
+        }
+
+    if out_dir.resolve() != SEED_DIR.resolve():
+        for name in PASSTHROUGH_SEEDS:
+            (out_dir / name).write_bytes((SEED_DIR / name).read_bytes())
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out-dir", type=Path, default=SEED_DIR)
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--bugs", type=int, default=10_000)
+    parser.add_argument("--releases", type=int, default=500)
+    parser.add_argument("--services", type=int, default=24)
+    parser.add_argument("--days", type=float, default=30.0, help="Length of the generated time window.")
+    parser.add_argument("--end", help="End of the time window (ISO 8601); defaults to now.")
+    parser.add_argument("--bad-release-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--gzip", action="store_true", help="Write .ndjson.gz instead of .ndjson.")
+    args = parser.parse_args()
+
+    summary = generate(
+        args.out_dir,
+        logs=args.logs,
+        bugs=args.bugs,
+        releases=args.releases,
+        services=args.services,
+        days=args.days,
+        end=args.end,
+        bad_release_ratio=args.bad_release_ratio,
+        seed=args.seed,
+        compress=args.gzip,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
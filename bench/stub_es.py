@@ -0,0 +1,342 @@
+"""
+Minimal in-process stand-in for the Elasticsearch HTTP API.
+
+It implements just enough of the REST surface for the Signal2Bug MCP server and
+setup script to run against it offline: product check, index and data stream creation,
+get mapping and settings, rollover, single-document index and get, mget, bulk (index, create,
+update), count, a match_all style search with max aggregations and point-in-time paging
+in @timestamp order. Point-in-time searches apply term, terms, range and bool filters; other searches
+ignore the query. Every request can be delayed by a fixed latency to mimic a remote
+cluster.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+
+def _comparable(value: Any) -> Any:
+    """Numbers as floats and ISO dates as epoch milliseconds, so date ranges can use either."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000
+        except ValueError:
+            return value
+    return value
+
+
+def _in_range(value: Any, bounds: Dict[str, Any]) -> bool:
+    if value is None:
+        return False
+    value = _comparable(value)
+    for op, bound in bounds.items():
+        if op not in ("gt", "gte", "lt", "lte") or (isinstance(bound, str) and ("||" in bound or "now" in bound)):
+            continue  # Date math is not evaluated; the bound is ignored.
+        bound = _comparable(bound)
+        if type(bound) is not type(value):
+            return False
+        if (op == "gt" and not value > bound) or (op == "gte" and not value >= bound):
+            return False
+        if (op == "lt" and not value < bound) or (op == "lte" and not value <= bound):
+            return False
+    return True
+
+
+def _clauses(spec: Dict[str, Any], occur: str) -> List[Dict[str, Any]]:
+    clauses = spec.get(occur, [])
+    return clauses if isinstance(clauses, list) else [clauses]
+
+
+def matches(source: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the filter subset of the query DSL; unsupported clauses match everything."""
+    if not query:
+        return True
+    kind, spec = next(iter(query.items()))
+    if kind in ("term", "terms"):
+        field, wanted = next(iter(spec.items()))
+        if kind == "term":
+            wanted = [wanted["value"] if isinstance(wanted, dict) else wanted]
+        value = source.get(field)
+        values = value if isinstance(value, list) else [value]
+        return any(v in wanted for v in values)
+    if kind == "range":
+        field, bounds = next(iter(spec.items()))
+        return _in_range(source.get(field), bounds)
+    if kind == "bool":
+        required = _clauses(spec, "filter") + _clauses(spec, "must")
+        if not all(matches(source, clause) for clause in required):
+            return False
+        if any(matches(source, clause) for clause in _clauses(spec, "must_not")):
+            return False
+        should = _clauses(spec, "should")
+        minimum = spec.get("minimum_should_match", 0 if required else 1)
+        return not should or sum(matches(source, clause) for clause in should) >= minimum
+    return True
+
+
+class StubStore:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.indices: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self.scripted_updates: List[Tuple[str, str, Dict[str, Any]]] = []
+        # PIT id -> index name, and the matching docs of each (PIT, query) in @timestamp order.
+        self.pits: Dict[str, str] = {}
+        # Data stream name -> backing index names; docs are stored under the stream name.
+        self.data_streams: Dict[str, List[str]] = {}
+        # Mappings as given at index creation; later mapping updates are not applied.
+        self.mappings: Dict[str, Dict[str, Any]] = {}
+        self.pit_results: Dict[Tuple[str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+
+    def put(self, index: str, doc_id: Optional[str], source: Dict[str, Any], create: bool = False) -> Tuple[str, str]:
+        """Store a doc; with create=True an existing id is left alone and the result is "conflict"."""
+        doc_id = doc_id or uuid4().hex
+        with self.lock:
+            exists = doc_id in self.indices[index]
+            if create and exists:
+                return doc_id, "conflict"
+            self.indices[index][doc_id] = source
+        return doc_id, "updated" if exists else "created"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    store: StubStore
+    latency_s: float = 0.0
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _route(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        body = self._body()
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if not parts:
+            self._send(200, {"name": "stub", "version": {"number": "8.15.0"}, "tagline": "You Know, for Search"})
+        elif parts[-1] == "_bulk":
+            self._send(200, self._bulk(parts[0] if len(parts) == 2 else None, body))
+        elif len(parts) == 3 and parts[1] == "_doc" and self.command == "GET":
+            source = self.store.indices.get(parts[0], {}).get(parts[2])
+            found = {"_index": parts[0], "_id": parts[2], "found": source is not None}
+            self._send(200 if source is not None else 404, {**found, "_source": source} if source else found)
+        elif len(parts) == 2 and parts[1] == "_mget":
+            docs = []
+            for doc_id in json.loads(body or b"{}").get("ids", []):
+                source = self.store.indices.get(parts[0], {}).get(doc_id)
+                found = {"_index": parts[0], "_id": doc_id, "found": source is not None}
+                docs.append({**found, "_source": source} if source else found)
+            self._send(200, {"docs": docs})
+        elif len(parts) >= 2 and parts[1] in ("_doc", "_create"):
+            create = parts[1] == "_create" or params.get("op_type") == "create"
+            doc_id, result = self.store.put(parts[0], parts[2] if len(parts) > 2 else None, json.loads(body), create)
+            if result == "conflict":
+                self._send(409, {"error": {"type": "version_conflict_engine_exception"}, "status": 409})
+            else:
+                self._send(201, {"_index": parts[0], "_id": doc_id, "result": result, "_version": 1})
+        elif len(parts) == 2 and parts[1] == "_count":
+            self._send(200, {"count": len(self.store.indices.get(parts[0], {}))})
+        elif parts[-1] == "_msearch":
+            self._send(200, self._msearch(body))
+        elif parts[-1] == "_pit" and len(parts) == 2:
+            pit_id = uuid4().hex
+            self.store.pits[pit_id] = parts[0]
+            self._send(200, {"id": pit_id})
+        elif parts == ["_pit"]:
+            pit_id = json.loads(body or b"{}").get("id")
+            with self.store.lock:
+                freed = self.store.pits.pop(pit_id, None) is not None
+                for key in [key for key in self.store.pit_results if key[0] == pit_id]:
+                    del self.store.pit_results[key]
+            self._send(200, {"succeeded": True, "num_freed": int(freed)})
+        elif parts == ["_search"] and "pit" in (body_json := json.loads(body or b"{}")):
+            self._send(200, self._pit_search(body_json))
+        elif parts[:2] == ["_search", "scroll"]:
+            # Every scroll is served in a single page, so continuations are always empty.
+            self._send(200, self._page([], 0, "stub-scroll"))
+        elif len(parts) == 2 and parts[1] == "_search":
+            self._send(200, self._search(parts[0], json.loads(body) if body else {}, params))
+        elif len(parts) == 1 and self.command == "HEAD":
+            known = parts[0] in self.store.indices or parts[0] in self.store.data_streams
+            self._send(200 if known else 404, {})
+        elif len(parts) == 1 and self.command == "PUT":
+            self.store.indices[parts[0]]
+            self.store.mappings[parts[0]] = json.loads(body or b"{}").get("mappings", {})
+            self._send(200, {"acknowledged": True, "index": parts[0]})
+        elif len(parts) == 2 and parts[1] == "_mapping" and self.command == "GET":
+            self._send(200, {parts[0]: {"mappings": self.store.mappings.get(parts[0], {})}})
+        elif len(parts) == 2 and parts[1] == "_settings" and self.command == "GET":
+            self._send(200, {parts[0]: {"settings": {}}})
+        elif parts[0] == "_data_stream" and len(parts) == 2:
+            self._data_stream(parts[1])
+        elif len(parts) == 2 and parts[1] == "_rollover" and parts[0] in self.store.data_streams:
+            backing = self.store.data_streams[parts[0]]
+            backing.append(f".ds-{parts[0]}-{len(backing) + 1:06d}")
+            rolled = {"old_index": backing[-2], "new_index": backing[-1]}
+            self._send(200, {"acknowledged": True, "rolled_over": True, **rolled})
+        else:
+            self._send(200, {"acknowledged": True})
+
+    def _data_stream(self, name: str) -> None:
+        if self.command == "PUT":
+            self.store.data_streams.setdefault(name, [f".ds-{name}-000001"])
+            self._send(200, {"acknowledged": True})
+        elif name in self.store.data_streams:
+            indices = [{"index_name": index} for index in self.store.data_streams[name]]
+            self._send(200, {"data_streams": [{"name": name, "indices": indices}]})
+        else:
+            self._send(404, {"error": {"type": "index_not_found_exception"}, "status": 404})
+
+    def _bulk(self, default_index: Optional[str], body: bytes) -> Dict[str, Any]:
+        lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+        items: List[Dict[str, Any]] = []
+        i = 0
+        while i < len(lines):
+            op_type, meta = next(iter(lines[i].items()))
+            index = meta.get("_index", default_index)
+            source = lines[i + 1] if op_type != "delete" else {}
+            i += 1 if op_type == "delete" else 2
+            if op_type == "update":
+                items.append({op_type: self._update(index, meta["_id"], source)})
+                continue
+            doc_id, result = self.store.put(index, meta.get("_id"), source, create=op_type == "create")
+            if result == "conflict":
+                error = {"type": "version_conflict_engine_exception"}
+                items.append({op_type: {"_index": index, "_id": doc_id, "status": 409, "error": error}})
+            else:
+                items.append({op_type: {"_index": index, "_id": doc_id, "result": result, "status": 201}})
+        errors = any("error" in next(iter(item.values())) for item in items)
+        return {"took": 1, "errors": errors, "items": items}
+
+    def _update(self, index: str, doc_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        # Partial-doc updates are merged (or upserted); scripts cannot run here, so they are only recorded.
+        with self.store.lock:
+            existing = self.store.indices.get(index, {}).get(doc_id)
+            if existing is None and body.get("doc_as_upsert"):
+                self.store.indices[index][doc_id] = body["doc"]
+                return {"_index": index, "_id": doc_id, "result": "created", "status": 201}
+            if existing is None:
+                error = {"type": "document_missing_exception"}
+                return {"_index": index, "_id": doc_id, "status": 404, "error": error}
+            if "doc" in body:
+                existing.update(body["doc"])
+            else:
+                self.store.scripted_updates.append((index, doc_id, body))
+        return {"_index": index, "_id": doc_id, "result": "updated", "status": 200}
+
+    def _search(self, index: str, body: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+        docs = list(self.store.indices.get(index, {}).items())
+        scroll_id = "stub-scroll" if "scroll" in params else None
+        size = len(docs) if scroll_id else int(body.get("size", params.get("size", 10)))
+        hits = [{"_index": index, "_id": doc_id, "_score": 1.0, "_source": src} for doc_id, src in docs[:size]]
+        if body.get("seq_no_primary_term"):
+            # Queries are not evaluated, so every search returns all docs; number them in insertion order.
+            for seq_no, hit in enumerate(hits):
+                hit.update(_seq_no=seq_no, _primary_term=1)
+        page = self._page(hits, len(docs), scroll_id)
+        # Only max aggregations are computed, over every doc in the index.
+        maxima = {name: agg["max"]["field"] for name, agg in body.get("aggs", {}).items() if "max" in agg}
+        if maxima:
+            page["aggregations"] = {
+                name: {"value": max((_comparable(src[field]) for _, src in docs if src.get(field)), default=None)}
+                for name, field in maxima.items()
+            }
+        return page
+
+    def _pit_search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        # Pages follow @timestamp order and sort values are (timestamp, position in the matching docs).
+        pit_id = body["pit"]["id"]
+        index = self.store.pits[pit_id]
+        key = (pit_id, json.dumps(body.get("query"), sort_keys=True))
+        with self.store.lock:
+            docs = self.store.pit_results.get(key)
+            if docs is None:
+                items = self.store.indices.get(index, {}).items()
+                docs = sorted(
+                    (item for item in items if matches(item[1], body.get("query"))),
+                    key=lambda item: _comparable(item[1].get("@timestamp") or 0),
+                )
+                self.store.pit_results[key] = docs
+        start = body["search_after"][1] + 1 if body.get("search_after") else 0
+        size = int(body.get("size", 10))
+        hits = [
+            {"_index": index, "_id": doc_id, "_score": None, "_source": src, "sort": [src.get("@timestamp"), pos]}
+            for pos, (doc_id, src) in enumerate(docs[start : start + size], start)
+        ]
+        page = self._page(hits, len(docs), None)
+        page["pit_id"] = pit_id
+        return page
+
+    def _msearch(self, body: bytes) -> Dict[str, Any]:
+        lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+        responses = []
+        for header, search in zip(lines[::2], lines[1::2]):
+            page = self._search(header["index"], search, {})
+            page["status"] = 200
+            responses.append(page)
+        return {"took": 1, "responses": responses}
+
+    @staticmethod
+    def _page(hits: List[Dict[str, Any]], total: int, scroll_id: Optional[str]) -> Dict[str, Any]:
+        page: Dict[str, Any] = {
+            "took": 1,
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {"total": {"value": total, "relation": "eq"}, "hits": hits},
+        }
+        if scroll_id:
+            page["_scroll_id"] = scroll_id
+        return page
+
+    do_GET = do_POST = do_PUT = do_HEAD = do_DELETE = _route
+
+
+class StubElasticsearch:
+    """Runs the stub on a background thread; use as a context manager."""
+
+    def __init__(self, latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.store = StubStore()
+        handler = type("Handler", (_Handler,), {"store": self.store, "latency_s": latency_ms / 1000.0})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubElasticsearch":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()